@@ -0,0 +1,61 @@
+"""
+Compare CSV extraction throughput: pandas C parser vs. the multithreaded
+Arrow reader at several block sizes, on plain and compressed input.
+
+Usage:
+    python -m scripts.benchmark_csv_reader [csv_path] [repeats]
+"""
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import pyarrow as pa
+
+from src.extract.csv_loader import COMPRESSED_EXTENSIONS, _load_csv, resolve_raw_file
+
+BLOCK_SIZES_MB = [1, 4, 16, 64]
+
+
+def _time(label: str, read_fn, repeats: int) -> None:
+    best = None
+    rows = 0
+    for _ in range(repeats):
+        start = perf_counter()
+        rows = len(read_fn())
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<36} rows={rows:>10,}  best={best:8.3f}s  {rows / best:>12,.0f} rows/s")
+
+
+def main(csv_path: Path, repeats: int = 3) -> None:
+    print(f"{csv_path} | {csv_path.stat().st_size / 1024 ** 2:,.1f} MB | Arrow threads: {pa.cpu_count()}")
+
+    reference = _load_csv(csv_path, csv_path.name, engine="pandas")
+    if not _load_csv(csv_path, csv_path.name, engine="arrow").equals(reference):
+        print("WARNING: arrow and pandas engines returned different DataFrames")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        inputs = [csv_path]
+        for extension, codec in COMPRESSED_EXTENSIONS.items():
+            compressed_path = Path(tmp_dir) / f"{csv_path.name}{extension}"
+            with pa.output_stream(str(compressed_path), compression=codec) as f:
+                f.write(csv_path.read_bytes())
+            inputs.append(compressed_path)
+
+        for file_path in inputs:
+            suffix = file_path.suffix if file_path != csv_path else ".csv"
+            _time(f"pandas C parser ({suffix})", lambda: _load_csv(file_path, file_path.name, engine="pandas"), repeats)
+            for block_size_mb in BLOCK_SIZES_MB:
+                _time(
+                    f"arrow, {block_size_mb:>2} MB blocks ({suffix})",
+                    lambda: _load_csv(file_path, file_path.name, engine="arrow", block_size_mb=block_size_mb),
+                    repeats
+                )
+
+
+if __name__ == "__main__":
+    main(
+        Path(sys.argv[1]) if len(sys.argv) > 1 else resolve_raw_file("orders.csv"),
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    )
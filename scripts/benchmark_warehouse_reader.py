@@ -0,0 +1,50 @@
+"""
+Compare warehouse read throughput: pd.read_sql vs. the streaming reader.
+
+Usage:
+    python -m scripts.benchmark_warehouse_reader [table_name] [repeats]
+"""
+import sys
+from time import perf_counter
+
+import pandas as pd
+
+from src.load.postgres_loader import _create_engine
+from src.load.warehouse_reader import clear_warehouse_cache, iter_query_batches
+
+
+def _time(label: str, read_fn, repeats: int) -> None:
+    best = None
+    rows = 0
+    for _ in range(repeats):
+        start = perf_counter()
+        rows = read_fn()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} rows={rows:>10,}  best={best:8.3f}s  {rows / best:>12,.0f} rows/s")
+
+
+def _count_batches(**kwargs) -> int:
+    return sum(batch.num_rows for batch in iter_query_batches(**kwargs))
+
+
+def main(table_name: str = "orders", repeats: int = 3) -> None:
+    query = f"SELECT * FROM public.{table_name}"
+    engine = _create_engine()
+
+    _time("pd.read_sql", lambda: len(pd.read_sql(query, engine)), repeats)
+    _time("server-side cursor", lambda: _count_batches(query=query, method="cursor"), repeats)
+    _time("COPY TO STDOUT -> Arrow", lambda: _count_batches(query=query, method="copy"), repeats)
+
+    clear_warehouse_cache()
+    _count_batches(query=query, cache_tables=[table_name])  # warm the cache
+    _time("local cache (Arrow IPC)", lambda: _count_batches(query=query, cache_tables=[table_name]), repeats)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "orders",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    )
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from time import monotonic
+
+from sqlalchemy import text
+
+from src.load.postgres_loader import _create_engine, get_table_versions
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class KpiQuery:
+    """A named, parameterized KPI query and the warehouse tables it reads."""
+    name: str
+    sql: str
+    tables: tuple[str, ...]
+    defaults: dict = field(default_factory=dict)
+    description: str = ""
+
+
+@dataclass
+class KpiResponse:
+    """Result of a KPI request. data is None on a 304 (ETag matched)."""
+    status: int
+    etag: str
+    data: list[dict] | None
+    cached: bool
+
+
+KPI_REGISTRY: dict[str, KpiQuery] = {}
+
+
+def register_kpi(kpi: KpiQuery) -> None:
+    """Adds (or replaces) a KPI definition in the registry."""
+    KPI_REGISTRY[kpi.name] = kpi
+    logger.info(f"Registered KPI: {kpi.name} | Tables: {list(kpi.tables)}")
+
+
+register_kpi(KpiQuery(
+    name="sales_by_market",
+    description="Sales, profit and order count per market",
+    tables=("orders",),
+    defaults={"start_date": "0001-01-01", "end_date": "9999-12-31"},
+    sql="""
+        SELECT "Market" AS market,
+               SUM("Sales") AS sales,
+               SUM("Profit") AS profit,
+               COUNT(DISTINCT "Order Key") AS orders
+        FROM public.orders
+        WHERE "Order Date" BETWEEN :start_date AND :end_date
+        GROUP BY "Market"
+        ORDER BY sales DESC
+    """
+))
+
+register_kpi(KpiQuery(
+    name="return_rate_by_region",
+    description="Share of orders returned, by the customer's current region",
+    tables=("orders", "returns", "dim_customers"),
+    defaults={"start_date": "0001-01-01", "end_date": "9999-12-31"},
+    sql="""
+        WITH order_regions AS (
+            SELECT DISTINCT o."Order Key", c."Region"
+            FROM public.orders o
+            JOIN public.dim_customers c
+              ON c."Customer ID" = o."Customer ID" AND c.is_current
+            WHERE o."Order Date" BETWEEN :start_date AND :end_date
+        ),
+        returned AS (
+            SELECT DISTINCT "Order Key" FROM public.returns WHERE "Returned" = 'Yes'
+        )
+        SELECT r."Region" AS region,
+               COUNT(*) AS orders,
+               COUNT(ret."Order Key") AS returned_orders,
+               COUNT(ret."Order Key")::float / COUNT(*) AS return_rate
+        FROM order_regions r
+        LEFT JOIN returned ret ON ret."Order Key" = r."Order Key"
+        GROUP BY r."Region"
+        ORDER BY return_rate DESC
+    """
+))
+
+register_kpi(KpiQuery(
+    name="top_products",
+    description="Top products by sales",
+    tables=("orders",),
+    defaults={"start_date": "0001-01-01", "end_date": "9999-12-31", "limit": 10},
+    sql="""
+        SELECT "Product ID" AS product_id,
+               MAX("Product Name") AS product_name,
+               SUM("Sales") AS sales,
+               SUM("Quantity")::bigint AS quantity,
+               SUM("Profit") AS profit
+        FROM public.orders
+        WHERE "Order Date" BETWEEN :start_date AND :end_date
+        GROUP BY "Product ID"
+        ORDER BY sales DESC
+        LIMIT :limit
+    """
+))
+
+
+class KpiService:
+    """
+    In-process KPI query service over the warehouse.
+
+    - Results are kept in an LRU cache with a TTL; cache keys include the
+      versions of the tables a KPI reads, so a pipeline run that bumps a
+      table version invalidates every dependent result.
+    - Table versions are re-read at most every version_check_interval
+      seconds, so warm requests are served without touching PostgreSQL.
+    - Concurrent identical requests share a single warehouse query.
+    - Responses carry an ETag; a matching If-None-Match returns 304.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 300.0,
+        version_check_interval: float = 5.0,
+        schema: str = "public"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_check_interval = version_check_interval
+        self.schema = schema
+
+        self._engine = _create_engine()
+        self._lock = threading.Lock()
+        self._cache: OrderedDict = OrderedDict()  # key -> (expires_at, etag, data)
+        self._inflight: dict = {}  # key -> Future
+        self._versions: dict[str, int] = {}
+        self._versions_checked_at = None
+
+    def close(self) -> None:
+        self._engine.dispose()
+        logger.info("KPI service PostgreSQL connection closed")
+
+    # -----------------------
+    # Table versions
+    # -----------------------
+    def refresh_versions(self) -> dict[str, int]:
+        """
+        Re-reads table versions and drops cached results built on older versions.
+        """
+        tables = sorted({table for kpi in KPI_REGISTRY.values() for table in kpi.tables})
+        with self._engine.connect() as conn:
+            versions = get_table_versions(conn, tables, self.schema)
+
+        with self._lock:
+            changed = {t for t, v in versions.items() if self._versions.get(t) != v}
+            self._versions = versions
+            self._versions_checked_at = monotonic()
+
+            if changed:
+                stale = [key for key in self._cache if changed & set(dict(key[2]))]
+                for key in stale:
+                    del self._cache[key]
+                if stale:
+                    logger.info(f"Invalidated {len(stale)} cached KPI results | Tables: {sorted(changed)}")
+
+        return versions
+
+    def _current_versions(self, tables: tuple[str, ...]) -> tuple:
+        checked_at = self._versions_checked_at
+        if checked_at is None or monotonic() - checked_at >= self.version_check_interval:
+            self.refresh_versions()
+        return tuple((table, self._versions.get(table, 0)) for table in sorted(tables))
+
+    # -----------------------
+    # Query execution
+    # -----------------------
+    def _resolve_params(self, kpi: KpiQuery, params: dict = None) -> dict:
+        params = dict(params or {})
+        unknown = set(params) - set(kpi.defaults)
+        if unknown:
+            logger.error(f"Unknown parameters for KPI {kpi.name}: {sorted(unknown)}")
+            raise ValueError(f"Unknown parameters for KPI {kpi.name}: {sorted(unknown)}")
+        return {**kpi.defaults, **params}
+
+    def _execute(self, kpi: KpiQuery, params: dict) -> tuple[str, list[dict]]:
+        with self._engine.connect() as conn:
+            rows = conn.execute(text(kpi.sql), params).mappings().all()
+
+        data = [dict(row) for row in rows]
+        payload = json.dumps(data, sort_keys=True, default=str)
+        etag = f'"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+        return etag, data
+
+    def query(self, name: str, params: dict = None, if_none_match: str = None) -> KpiResponse:
+        """
+        Serves a KPI, from memory when possible.
+
+        Args:
+            name (str): Registered KPI name
+            params (dict): KPI parameters (defaults fill the rest)
+            if_none_match (str): ETag from a previous response
+
+        Returns:
+            KpiResponse: 200 with data, or 304 when the ETag still matches
+        """
+        kpi = KPI_REGISTRY.get(name)
+        if kpi is None:
+            logger.error(f"Unknown KPI: {name}")
+            raise KeyError(f"Unknown KPI: {name}")
+
+        params = self._resolve_params(kpi, params)
+        key = (name, tuple(sorted(params.items())), self._current_versions(kpi.tables))
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > monotonic():
+                self._cache.move_to_end(key)
+                return self._respond(entry[1], entry[2], if_none_match, cached=True)
+
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_leader:
+            # Another request is already running this exact query
+            etag, data = future.result()
+            return self._respond(etag, data, if_none_match, cached=True)
+
+        try:
+            etag, data = self._execute(kpi, params)
+        except Exception as e:
+            logger.error(f"Error executing KPI {name}: {e}")
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        # Cache the result and retire the in-flight entry atomically, so a
+        # request arriving in between never finds neither and re-runs the query
+        with self._lock:
+            self._cache[key] = (monotonic() + self.ttl_seconds, etag, data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result((etag, data))
+
+        return self._respond(etag, data, if_none_match, cached=False)
+
+    @staticmethod
+    def _respond(etag: str, data: list[dict], if_none_match: str, cached: bool) -> KpiResponse:
+        if if_none_match is not None and if_none_match == etag:
+            return KpiResponse(status=304, etag=etag, data=None, cached=cached)
+        return KpiResponse(status=200, etag=etag, data=data, cached=cached)
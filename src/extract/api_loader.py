@@ -1,8 +1,17 @@
 import pandas as pd
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
+from typing import Iterator
 from src.utils.logger import get_logger
-from src.utils.config import EXCHANGE_RATE_API_KEY, EXCHANGE_RATE_API_URL, FAKE_STORE_API_URL
+from src.utils.config import (
+    EXCHANGE_RATE_API_KEY,
+    EXCHANGE_RATE_API_URL,
+    FAKE_STORE_API_URL,
+    FAKE_STORE_PAGINATION,
+    FAKE_STORE_PAGE_SIZE
+)
 
 logger = get_logger(__name__)
 
@@ -25,6 +34,199 @@ def _fetch_json(url: str, params: dict = None, max_retries: int = 3, sleep_sec:
                 raise
 
 
+class PaginatedSource:
+    """
+    Generic paginated JSON API source.
+
+    Pagination modes:
+        - None: a single request returns every record
+        - "page": ?page=1,2,... with a page size parameter
+        - "offset": ?offset=0,N,2N,... with a page size parameter
+        - "cursor": each response carries the cursor for the next page
+
+    Page and offset requests are prefetched concurrently with at most
+    max_in_flight requests outstanding; cursor pages are inherently
+    sequential, so only the next page is fetched while the current one is
+    being consumed. Pages are yielded in order.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pagination: str = None,
+        params: dict = None,
+        page_size: int = 100,
+        records_path: list[str] = None,
+        page_param: str = "page",
+        offset_param: str = "offset",
+        size_param: str = "limit",
+        cursor_param: str = "cursor",
+        next_cursor_path: list[str] = None,
+        start_page: int = 1,
+        max_pages: int = None,
+        max_in_flight: int = 4
+    ):
+        valid_modes = {None, "page", "offset", "cursor"}
+        if pagination not in valid_modes:
+            logger.error(f"Invalid pagination mode: {pagination}")
+            raise ValueError(f"pagination must be one of {valid_modes}")
+
+        self.url = url
+        self.pagination = pagination
+        self.params = params or {}
+        self.page_size = page_size
+        self.records_path = records_path or []
+        self.page_param = page_param
+        self.offset_param = offset_param
+        self.size_param = size_param
+        self.cursor_param = cursor_param
+        self.next_cursor_path = next_cursor_path or ["next"]
+        self.start_page = start_page
+        self.max_pages = max_pages
+        self.max_in_flight = max(1, max_in_flight)
+
+    @staticmethod
+    def _dig(data, path: list[str]):
+        for key in path:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    def _records(self, data) -> list[dict]:
+        records = self._dig(data, self.records_path)
+        if not isinstance(records, list):
+            logger.error(f"Unexpected page payload from {self.url}: {str(data)[:200]}")
+            raise ValueError(f"Invalid paginated response from {self.url}")
+        return records
+
+    def _page_params(self, page_number: int) -> dict:
+        params = dict(self.params)
+        if self.pagination == "page":
+            params[self.page_param] = self.start_page + page_number
+            params[self.size_param] = self.page_size
+        elif self.pagination == "offset":
+            params[self.offset_param] = page_number * self.page_size
+            params[self.size_param] = self.page_size
+        return params
+
+    def _fetch_records(self, params: dict) -> list[dict]:
+        return self._records(_fetch_json(self.url, params=params))
+
+    def iter_pages(self) -> Iterator[list[dict]]:
+        """
+        Yields one list of raw records per page.
+        """
+        if self.pagination is None:
+            yield self._fetch_records(self.params)
+        elif self.pagination == "cursor":
+            yield from self._iter_cursor_pages()
+        else:
+            yield from self._iter_numbered_pages()
+
+    def _iter_numbered_pages(self) -> Iterator[list[dict]]:
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            in_flight = deque()
+            next_page = 0
+
+            def _submit():
+                nonlocal next_page
+                if self.max_pages is None or next_page < self.max_pages:
+                    in_flight.append(pool.submit(self._fetch_records, self._page_params(next_page)))
+                    next_page += 1
+
+            for _ in range(self.max_in_flight):
+                _submit()
+
+            try:
+                while in_flight:
+                    records = in_flight.popleft().result()
+                    if not records:
+                        break
+
+                    yield records
+
+                    # A short page is the last one
+                    if len(records) < self.page_size:
+                        break
+                    _submit()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    def _iter_cursor_pages(self) -> Iterator[list[dict]]:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            params = dict(self.params)
+            params[self.size_param] = self.page_size
+            pending = pool.submit(_fetch_json, self.url, params)
+            pages = 0
+
+            while pending is not None:
+                data = pending.result()
+                pages += 1
+
+                cursor = self._dig(data, self.next_cursor_path)
+                pending = None
+                if cursor and (self.max_pages is None or pages < self.max_pages):
+                    # Fetch the next page while the caller consumes this one
+                    params = {**params, self.cursor_param: cursor}
+                    pending = pool.submit(_fetch_json, self.url, params)
+
+                records = self._records(data)
+                if records:
+                    yield records
+
+    def iter_batches(self, batch_size: int = 1000, flatten: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Yields DataFrames of up to batch_size records.
+
+        Nested objects are flattened with '_' separators when flatten is True
+        (e.g. {"rating": {"rate": 3.9}} -> rating_rate).
+        """
+        buffer = []
+        for records in self.iter_pages():
+            buffer.extend(records)
+            while len(buffer) >= batch_size:
+                yield self._to_frame(buffer[:batch_size], flatten)
+                buffer = buffer[batch_size:]
+
+        if buffer:
+            yield self._to_frame(buffer, flatten)
+
+    @staticmethod
+    def _to_frame(records: list[dict], flatten: bool) -> pd.DataFrame:
+        if flatten:
+            return pd.json_normalize(records, sep="_")
+        return pd.DataFrame(records)
+
+
+def fake_store_products_source() -> PaginatedSource:
+    """
+    Paginated source for the Fake Store products endpoint.
+
+    The public Fake Store API returns the whole catalog in one response;
+    set FAKE_STORE_PAGINATION for a paginated catalog endpoint.
+    """
+    return PaginatedSource(
+        url=FAKE_STORE_API_URL,
+        pagination=FAKE_STORE_PAGINATION,
+        page_size=FAKE_STORE_PAGE_SIZE
+    )
+
+
+def iter_fake_store_product_batches(batch_size: int = 1000) -> Iterator[pd.DataFrame]:
+    """
+    Stream Fake Store products as flattened DataFrame batches.
+    """
+    logger.info("Streaming products from Fake Store API")
+
+    total = 0
+    for batch in fake_store_products_source().iter_batches(batch_size=batch_size):
+        total += len(batch)
+        logger.info(f"Fake Store products batch fetched: {len(batch)} items | Total: {total}")
+        yield batch
+
+
 def load_exchange_rates(base_currency: str = "USD") -> pd.DataFrame:
     """
     Load current exchange rates from ExchangeRate API.
@@ -57,12 +259,12 @@ def load_fake_store_products() -> pd.DataFrame:
     """
     logger.info("Fetching products from Fake Store API")
 
-    data = _fetch_json(FAKE_STORE_API_URL)
+    records = [
+        record
+        for page in fake_store_products_source().iter_pages()
+        for record in page
+    ]
 
-    if not isinstance(data, list):
-        logger.error(f"Unexpected response from Fake Store API: {data}")
-        raise ValueError("Invalid response from Fake Store API")
-
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(records)
     logger.info(f"Fake Store products fetched: {len(df)} items")
-    return df
\ No newline at end of file
+    return df
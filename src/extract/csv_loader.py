@@ -1,23 +1,146 @@
+import io
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pathlib import Path
+from typing import Callable
 
-from src.utils.config import RAW_DATA_DIR
+from src.utils.config import RAW_DATA_DIR, DEDUP_MEMORY_BUDGET_MB, CSV_READER_ENGINE, CSV_BLOCK_SIZE_MB
+from src.transform.deduplication import dedupe_csv
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Compressed raw drops are decompressed transparently, based on the file extension
+COMPRESSED_EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
 
-def _load_csv(file_path: Path, dataset_name: str) -> pd.DataFrame:
+# pandas' default NA and boolean tokens, so both engines parse a file identically
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+_TRUE_VALUES = ["True", "TRUE", "true"]
+_FALSE_VALUES = ["False", "FALSE", "false"]
+
+
+def _compression(file_path: Path) -> str | None:
+    return COMPRESSED_EXTENSIONS.get(file_path.suffix.lower())
+
+
+def resolve_raw_file(name: str) -> Path:
+    """
+    Resolves a raw file name to the plain or compressed file present in
+    RAW_DATA_DIR (e.g. orders.csv, orders.csv.gz or orders.csv.zst).
+    """
+    for suffix in ["", *COMPRESSED_EXTENSIONS]:
+        file_path = RAW_DATA_DIR / f"{name}{suffix}"
+        if file_path.exists():
+            return file_path
+    return RAW_DATA_DIR / name
+
+
+def _read_byte_range(file_path: Path, byte_range: tuple[int, int]) -> io.BytesIO:
+    """
+    Returns the header line plus bytes [start, end) of a CSV file, so a
+    newly appended block of rows can be parsed on its own.
+    """
+    start, end = byte_range
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        f.seek(max(start, len(header)))
+        body = f.read(end - max(start, len(header)))
+    return io.BytesIO(header + body)
+
+
+def _read_csv_pandas(open_source: Callable, block_size_mb: int) -> pd.DataFrame:
+    """Single-threaded pandas C parser."""
+    with open_source() as source:
+        return pd.read_csv(source)
+
+
+def _read_csv_arrow(open_source: Callable, block_size_mb: int) -> pd.DataFrame:
+    """
+    Multithreaded Arrow CSV reader. Blocks of block_size_mb are parsed and
+    converted in parallel, so larger blocks mean fewer, bigger tasks.
+    """
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=block_size_mb * 1024 * 1024)
+    convert_options = pa_csv.ConvertOptions(
+        null_values=_NA_VALUES,
+        true_values=_TRUE_VALUES,
+        false_values=_FALSE_VALUES,
+        strings_can_be_null=True
+    )
+
+    # Arrow infers dates, times and timestamps where pandas keeps the raw
+    # strings; infer the schema from the first block and pin those to string
+    with open_source() as source:
+        schema = pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options).schema
+    convert_options.column_types = {
+        field.name: pa.string() for field in schema if pa.types.is_temporal(field.type)
+    }
+
+    with open_source() as source:
+        table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+
+    # A column that is all null in the first block can still be inferred as
+    # temporal from later blocks; re-read with those pinned as well
+    late_temporal = {field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)}
+    if late_temporal:
+        convert_options.column_types = {**convert_options.column_types, **late_temporal}
+        with open_source() as source:
+            table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+
+    # All-null columns come back as float NaN from pandas
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+    return table.to_pandas()
+
+
+CSV_ENGINES: dict[str, Callable] = {
+    "pandas": _read_csv_pandas,
+    "arrow": _read_csv_arrow,
+}
+
+
+def _load_csv(
+    file_path: Path,
+    dataset_name: str,
+    byte_range: tuple[int, int] = None,
+    engine: str = CSV_READER_ENGINE,
+    block_size_mb: int = CSV_BLOCK_SIZE_MB
+) -> pd.DataFrame:
     """
     Internal helper to load a CSV file with logging and basic checks.
+    If byte_range is given, only rows inside that byte range are loaded.
+    Compressed files (.gz, .zst) are always read whole.
     """
-    logger.info(f"Starting extraction for dataset: {dataset_name}")
+    logger.info(f"Starting extraction for dataset: {dataset_name} | Engine: {engine}")
+
+    if engine not in CSV_ENGINES:
+        logger.error(f"Invalid CSV reader engine: {engine}")
+        raise ValueError(f"engine must be one of {set(CSV_ENGINES)}")
 
     if not file_path.exists():
         logger.error(f"File not found: {file_path}")
         raise FileNotFoundError(f"Missing file: {file_path}")
 
-    df = pd.read_csv(file_path)
+    compression = _compression(file_path)
+    if compression is not None and byte_range is not None and byte_range[0] > 0:
+        logger.error(f"Byte ranges are not supported for compressed file {file_path.name}")
+        raise ValueError(f"Cannot read a byte range of compressed file: {file_path}")
+
+    if compression is None and byte_range is not None:
+        logger.info(f"Reading byte range {byte_range[0]}-{byte_range[1]} of {file_path.name}")
+        data = _read_byte_range(file_path, byte_range).getvalue()
+
+        def open_source():
+            return io.BytesIO(data)
+    else:
+        def open_source():
+            return pa.input_stream(str(file_path), compression=compression)
+
+    df = CSV_ENGINES[engine](open_source, block_size_mb)
 
     logger.info(
         f"Completed extraction for {dataset_name} | "
@@ -27,10 +150,10 @@ def _load_csv(file_path: Path, dataset_name: str) -> pd.DataFrame:
     return df
 
 
-def load_orders() -> pd.DataFrame:
+def load_orders(file_path: Path = None, byte_range: tuple[int, int] = None) -> pd.DataFrame:
     """Load orders table with all order columns. Customer info remains as Customer ID only."""
-    file_path = RAW_DATA_DIR / "orders.csv"
-    df = _load_csv(file_path, "Orders")
+    file_path = file_path or resolve_raw_file("orders.csv")
+    df = _load_csv(file_path, "Orders", byte_range)
 
     df["Order ID"] = df["Order ID"].astype(str)
     df["Customer ID"] = df["Customer ID"].astype(str)
@@ -38,26 +161,49 @@ def load_orders() -> pd.DataFrame:
     return df
 
 
-def load_customers() -> pd.DataFrame:
-    """Extract unique customers from orders.csv."""
-    file_path = RAW_DATA_DIR / "orders.csv"
-    df = _load_csv(file_path, "Orders")
+def load_customers(file_path: Path = None, byte_range: tuple[int, int] = None) -> pd.DataFrame:
+    """
+    Extract unique customers from orders.csv.
+    Keeps the attributes from each customer's most recent order.
+    """
+    file_path = file_path or resolve_raw_file("orders.csv")
+    customer_cols = ["Customer ID", "Customer Name", "Segment", "City", "State", "Region", "Postal Code", "Country"]
+
+    if byte_range is None and file_path.exists() and file_path.stat().st_size > DEDUP_MEMORY_BUDGET_MB * 1024 * 1024:
+        # Order history larger than the memory budget: hash-partitioned dedup on disk
+        logger.info(f"Starting out-of-core customer extraction from {file_path.name}")
+        customers = pd.concat(
+            dedupe_csv(
+                file_path,
+                key="Customer ID",
+                columns=customer_cols + ["Order Date"],
+                policy="latest",
+                timestamp_column="Order Date"
+            ),
+            ignore_index=True
+        )[customer_cols]
+    else:
+        df = _load_csv(file_path, "Orders", byte_range)
+
+        # ISO dates sort chronologically as strings; stable sort keeps file order on ties
+        if "Order Date" in df.columns:
+            df = df.sort_values("Order Date", kind="stable")
 
-    customers = df[
-        ["Customer ID", "Customer Name", "Segment", "City", "State", "Region", "Postal Code", "Country"]
-    ].drop_duplicates(subset=["Customer ID"])
+        customers = df[customer_cols].drop_duplicates(subset=["Customer ID"], keep="last")
 
-    # Ensure Customer ID and Postal Code are strings
+    # Ensure Customer ID and Postal Code are strings. A batch that parsed Postal Code
+    # as float renders "10024.0", so float-formatted integers lose their ".0";
+    # other codes (ZIP+4, non-US formats) are kept as they are
     customers["Customer ID"] = customers["Customer ID"].astype(str)
-    customers["Postal Code"] = customers["Postal Code"].astype(str)
+    customers["Postal Code"] = customers["Postal Code"].astype("string").str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
 
     return customers
 
 
-def load_returns() -> pd.DataFrame:
+def load_returns(file_path: Path = None, byte_range: tuple[int, int] = None) -> pd.DataFrame:
     """Load returns dataset from returns.csv."""
-    file_path = RAW_DATA_DIR / "returns.csv"
-    df = _load_csv(file_path, "Returns")
+    file_path = file_path or resolve_raw_file("returns.csv")
+    df = _load_csv(file_path, "Returns", byte_range)
 
     # Ensure correct types
     df["Order ID"] = df["Order ID"].astype(str)
@@ -66,13 +212,13 @@ def load_returns() -> pd.DataFrame:
     return df
 
 
-def load_leads() -> pd.DataFrame:
+def load_leads(file_paths: list[Path] = None) -> pd.DataFrame:
     """
-    Load leads dataset from people.csv.
+    Load leads dataset from people.csv, or from several people files in order.
     Splits 'Person' into first and last name robustly.
     """
-    file_path = RAW_DATA_DIR / "people.csv"
-    df = _load_csv(file_path, "People")
+    file_paths = file_paths or [resolve_raw_file("people.csv")]
+    df = pd.concat([_load_csv(file_path, "People") for file_path in file_paths], ignore_index=True)
 
     if "Person" in df.columns:
         # Strip spaces and replace multiple spaces with single space
@@ -0,0 +1,285 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from time import sleep, time
+from typing import Callable
+
+from src.utils.config import RAW_DATA_DIR, RAW_LEDGER_PATH, RAW_MAX_ATTEMPTS
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Raw file name prefix -> dataset; parents are listed (and processed) before children
+RAW_DATASETS = {
+    "orders": "orders",
+    "returns": "returns",
+    "people": "leads",
+}
+
+RAW_EXTENSIONS = (".csv", ".csv.gz", ".csv.zst")
+
+# Compressed drops cannot be appended to byte-wise, so any change is a rewrite
+COMPRESSED_EXTENSIONS = (".gz", ".zst")
+
+
+@dataclass
+class RawDrop:
+    """A new or changed raw file, and the byte range that still needs processing."""
+    path: Path
+    dataset: str
+    byte_range: tuple[int, int]
+    is_rewrite: bool
+    fingerprint: dict
+
+
+def _sha256_prefix(file_path: Path, length: int) -> str:
+    digest = hashlib.sha256()
+    remaining = length
+    with open(file_path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _complete_length(file_path: Path, size: int) -> int:
+    """
+    Length of the file up to and including its last newline, so a row that
+    is still being written is left for the next poll.
+    """
+    with open(file_path, "rb") as f:
+        position = size
+        while position > 0:
+            step = min(1 << 16, position)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                return position - step + newline + 1
+            position -= step
+    return 0
+
+
+def _is_compressed(file_path: Path) -> bool:
+    return file_path.name.lower().endswith(COMPRESSED_EXTENSIONS)
+
+
+def _processable_length(file_path: Path, size: int) -> int:
+    """Bytes ready for processing: complete rows, or the whole compressed file."""
+    if _is_compressed(file_path):
+        return size
+    return _complete_length(file_path, size)
+
+
+def dataset_for(file_path: Path) -> str | None:
+    """Maps a raw file name (e.g. orders_20261019T0900.csv) to its dataset."""
+    if not file_path.name.lower().endswith(RAW_EXTENSIONS):
+        return None
+    for prefix, dataset in RAW_DATASETS.items():
+        if file_path.name.lower().startswith(prefix):
+            return dataset
+    return None
+
+
+def dataset_files(dataset: str, raw_dir: Path = RAW_DATA_DIR) -> list[Path]:
+    """All raw files of a dataset, in name order (e.g. people.csv, people_20261019.csv)."""
+    return [
+        file_path for file_path in sorted(raw_dir.iterdir())
+        if file_path.is_file() and dataset_for(file_path) == dataset
+    ]
+
+
+class RawFileLedger:
+    """
+    JSON ledger of processed raw files.
+
+    Per file it records how many bytes have been processed and a hash of
+    those bytes, so appends can be told apart from rewrites. Failed
+    micro-batches are counted per file and start byte, and quarantined
+    once they reach the attempt limit.
+    """
+
+    def __init__(self, ledger_path: Path = RAW_LEDGER_PATH):
+        self.ledger_path = ledger_path
+        self.entries: dict[str, dict] = {}
+        self.failures: dict[str, dict] = {}
+        if ledger_path.exists():
+            with open(ledger_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if "files" in data:
+                self.entries, self.failures = data["files"], data.get("failures", {})
+            else:
+                self.entries = data  # ledgers written before failures were tracked
+
+    def save(self) -> None:
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.ledger_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.entries, "failures": self.failures}, f, indent=2, sort_keys=True)
+        tmp_path.replace(self.ledger_path)
+
+    def record(self, drop: RawDrop) -> None:
+        self.entries[drop.path.name] = drop.fingerprint
+        self.failures.pop(drop.path.name, None)
+        self.save()
+
+    def _failure(self, drop: RawDrop) -> dict | None:
+        failure = self.failures.get(drop.path.name)
+        if failure is None or failure["start"] != drop.byte_range[0]:
+            return None
+        return failure
+
+    def is_quarantined(self, drop: RawDrop) -> bool:
+        failure = self._failure(drop)
+        return failure is not None and failure["quarantined"]
+
+    def record_failure(self, drop: RawDrop, error: Exception, max_attempts: int = RAW_MAX_ATTEMPTS) -> dict:
+        """
+        Counts a failed attempt at a drop and remembers its byte range, which
+        scan_raw_drops retries unchanged. Returns the failure entry, which is
+        quarantined once attempts reach max_attempts.
+        """
+        failure = self._failure(drop) or {"start": drop.byte_range[0], "end": drop.byte_range[1], "attempts": 0}
+        failure["attempts"] += 1
+        failure["error"] = str(error)
+        failure["quarantined"] = failure["attempts"] >= max_attempts
+        self.failures[drop.path.name] = failure
+        self.save()
+        return failure
+
+    def mark_processed(self, file_path: Path) -> None:
+        """Records a file as fully processed (e.g. after a full pipeline run)."""
+        size = file_path.stat().st_size
+        processed = _processable_length(file_path, size)
+        self.entries[file_path.name] = {
+            "size": size,
+            "mtime_ns": file_path.stat().st_mtime_ns,
+            "processed_bytes": processed,
+            "processed_sha256": _sha256_prefix(file_path, processed),
+        }
+        self.failures.pop(file_path.name, None)
+        self.save()
+
+
+def scan_raw_drops(
+    ledger: RawFileLedger,
+    raw_dir: Path = RAW_DATA_DIR,
+    settle_seconds: float = 5.0
+) -> list[RawDrop]:
+    """
+    Finds raw files with unprocessed bytes.
+
+    Files modified within the last settle_seconds are skipped until their
+    writer has finished. Appended files yield only their new byte range;
+    compressed files are always processed whole.
+    """
+    drops = []
+    now = time()
+
+    for file_path in sorted(raw_dir.iterdir()):
+        dataset = dataset_for(file_path)
+        if dataset is None or not file_path.is_file():
+            continue
+
+        stat = file_path.stat()
+        entry = ledger.entries.get(file_path.name)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            continue
+        if now - stat.st_mtime < settle_seconds:
+            continue
+
+        processed = _processable_length(file_path, stat.st_size)
+        start, is_rewrite = 0, entry is not None
+
+        if entry and _is_compressed(file_path):
+            if _sha256_prefix(file_path, processed) == entry["processed_sha256"]:
+                start = processed  # same content, only touched
+        elif entry and processed >= entry["processed_bytes"]:
+            same_prefix = _sha256_prefix(file_path, entry["processed_bytes"]) == entry["processed_sha256"]
+            if same_prefix:
+                start, is_rewrite = entry["processed_bytes"], False
+
+        # A failed micro-batch is retried over exactly the same byte range, so it
+        # keeps the batch id its load may already have claimed; bytes appended
+        # since then follow as the next drop
+        failure = ledger.failures.get(file_path.name)
+        retry_end = None
+        if failure and failure["start"] == start and not _is_compressed(file_path):
+            if start < failure.get("end", start) < processed:
+                retry_end = processed = failure["end"]
+
+        fingerprint = {
+            # A short size makes the next scan pick up the bytes past a retried range
+            "size": stat.st_size if retry_end is None else retry_end,
+            "mtime_ns": stat.st_mtime_ns,
+            "processed_bytes": processed,
+            "processed_sha256": _sha256_prefix(file_path, processed),
+        }
+
+        if processed <= start:
+            # Only metadata changed (e.g. touched) or no complete new row yet
+            if processed == start:
+                ledger.entries[file_path.name] = fingerprint
+            continue
+
+        drops.append(RawDrop(file_path, dataset, (start, processed), is_rewrite, fingerprint))
+
+    ledger.save()
+
+    dataset_order = list(RAW_DATASETS.values())
+    return sorted(drops, key=lambda drop: (dataset_order.index(drop.dataset), drop.path.name))
+
+
+def watch_raw_dir(
+    handler: Callable[[RawDrop], None],
+    raw_dir: Path = RAW_DATA_DIR,
+    ledger_path: Path = RAW_LEDGER_PATH,
+    poll_seconds: float = 30.0,
+    settle_seconds: float = 5.0,
+    once: bool = False,
+    max_attempts: int = RAW_MAX_ATTEMPTS
+) -> None:
+    """
+    Polls raw_dir and hands every new or appended file to handler as a micro-batch.
+
+    A drop is recorded in the ledger only after its handler succeeds, so a
+    failed micro-batch is retried on the next poll, up to max_attempts times.
+    After that it is quarantined: skipped until its entry is removed from
+    the ledger's "failures", or the file is rewritten.
+    """
+    ledger = RawFileLedger(ledger_path)
+    logger.info(f"Watching {raw_dir} for raw drops | Poll: {poll_seconds}s")
+
+    while True:
+        for drop in scan_raw_drops(ledger, raw_dir, settle_seconds):
+            if ledger.is_quarantined(drop):
+                continue
+
+            logger.info(
+                f"Processing raw drop {drop.path.name} | Dataset: {drop.dataset} | "
+                f"Bytes: {drop.byte_range[0]}-{drop.byte_range[1]} | Rewrite: {drop.is_rewrite}"
+            )
+            try:
+                handler(drop)
+            except Exception as e:
+                failure = ledger.record_failure(drop, e, max_attempts)
+                if failure["quarantined"]:
+                    logger.error(
+                        f"Micro-batch failed for {drop.path.name}, quarantined after {failure['attempts']} attempts; "
+                        f"remove it from \"failures\" in {ledger.ledger_path} to retry: {e}"
+                    )
+                else:
+                    logger.error(
+                        f"Micro-batch failed for {drop.path.name}, will retry "
+                        f"(attempt {failure['attempts']}/{max_attempts}): {e}"
+                    )
+                continue
+            ledger.record(drop)
+
+        if once:
+            break
+        sleep(poll_seconds)
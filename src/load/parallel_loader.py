@@ -0,0 +1,295 @@
+import io
+import queue
+import threading
+import uuid
+from itertools import chain
+from time import perf_counter
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from sqlalchemy import inspect, text
+
+from src.load.postgres_loader import _create_engine, bump_table_version, claim_batch, forget_batches
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+def _split_frame(df: pd.DataFrame, n_slices: int) -> Iterable[pd.DataFrame]:
+    """
+    Splits a DataFrame into n_slices contiguous row slices.
+    """
+    bounds = np.linspace(0, len(df), n_slices + 1, dtype=np.int64)
+    return (df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start)
+
+
+def _column_list(columns) -> str:
+    return ", ".join(f'"{col}"' for col in columns)
+
+
+def _copy_chunk(cursor, df: pd.DataFrame, qualified_table: str) -> int:
+    """
+    COPYs one chunk into a table as CSV. Returns the number of bytes sent.
+    """
+    # Arrow's CSV writer releases the GIL, so workers serialize in parallel;
+    # it also writes nulls unquoted and empty strings quoted, as COPY expects
+    buffer = io.BytesIO()
+    pa_csv.write_csv(
+        pa.Table.from_pandas(df, preserve_index=False),
+        buffer,
+        write_options=pa_csv.WriteOptions(include_header=False)
+    )
+    size = buffer.tell()
+    buffer.seek(0)
+
+    cursor.copy_expert(
+        f"COPY {qualified_table} ({_column_list(df.columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+    return size
+
+
+def _load_worker(
+    worker_id: int,
+    engine,
+    stage_table: str,
+    chunks: queue.Queue,
+    abort: threading.Event,
+    stats: list,
+    errors: list
+) -> None:
+    """
+    Drains chunks from the queue into the shared staging table over its
+    own pooled connection.
+    """
+    worker_stats = {"worker": worker_id, "chunks": 0, "rows": 0, "bytes": 0, "seconds": 0.0}
+    stats[worker_id] = worker_stats
+    conn = engine.raw_connection()
+
+    try:
+        with conn.cursor() as cursor:
+            while True:
+                chunk = chunks.get()
+                if chunk is _STOP:
+                    break
+                if abort.is_set():
+                    continue  # keep draining so the producer never blocks
+
+                start = perf_counter()
+                worker_stats["bytes"] += _copy_chunk(cursor, chunk, stage_table)
+                conn.commit()
+                worker_stats["seconds"] += perf_counter() - start
+                worker_stats["chunks"] += 1
+                worker_stats["rows"] += len(chunk)
+
+    except Exception as e:
+        logger.error(f"Parallel load worker {worker_id} failed: {e}")
+        errors.append(e)
+        abort.set()
+        # Drain remaining chunks so the producer can finish
+        while chunks.get() is not _STOP:
+            pass
+
+    finally:
+        conn.close()
+
+
+def parallel_load_to_postgres(
+    data: pd.DataFrame | Iterable[pd.DataFrame],
+    table_name: str,
+    schema: str = "public",
+    if_exists: str = "append",
+    n_workers: int = 4,
+    primary_key: str = None,
+    dtype_map: dict = None,
+    slices_per_worker: int = 4,
+    batch_id: str = None
+) -> dict:
+    """
+    Loads a DataFrame or a stream of chunks over several connections at once.
+
+    Workers COPY their slices concurrently into one staging table, each over
+    a dedicated pooled connection. Once every worker has finished, a single
+    transaction publishes the rows and bumps the table version:
+
+    - replace, or a new table: the staging table is renamed onto the target,
+      so publishing costs no second copy of the data
+    - append to an existing table: rows are moved with INSERT ... SELECT
+      (the target may be a partitioned table; PostgreSQL routes rows to
+      partitions), from an unlogged staging table
+
+    If any worker fails the target is left untouched.
+
+    Args:
+        data (pd.DataFrame | Iterable[pd.DataFrame]): Rows to load
+        table_name (str): Target table name
+        schema (str): Target schema
+        if_exists (str): 'replace', 'append', or 'fail'
+        n_workers (int): Number of parallel connections
+        primary_key (str): Column to set as primary key (for new tables)
+        dtype_map (dict): Optional dict {col_name: sqlalchemy_type} for type enforcement
+        slices_per_worker (int): Slices per worker when data is a single DataFrame
+        batch_id (str): Optional micro-batch id; a batch already loaded into the table is skipped
+
+    Returns:
+        dict: Total rows, COPY and publish seconds, and per-worker stats
+        (rows, bytes, seconds and rows/s)
+    """
+    valid_modes = {"replace", "append", "fail"}
+    if if_exists not in valid_modes:
+        logger.error(f"Invalid if_exists: {if_exists}")
+        raise ValueError(f"if_exists must be one of {valid_modes}")
+
+    if isinstance(data, pd.DataFrame):
+        chunks = _split_frame(data, n_workers * slices_per_worker)
+    else:
+        chunks = iter(data)
+
+    first = next(chunks, None)
+    if first is None:
+        logger.warning(f"No rows to load into {schema}.{table_name}")
+        return {"rows": 0, "copy_seconds": 0.0, "publish_seconds": 0.0, "workers": []}
+    chunks = chain([first], chunks)
+    template = first.head(0)
+
+    logger.info(
+        f"Starting parallel load to PostgreSQL | Table: {schema}.{table_name} | "
+        f"Mode: {if_exists} | Workers: {n_workers}"
+    )
+
+    engine = _create_engine(pool_size=n_workers + 1, max_overflow=0)
+    stage_table = f"_stage_{table_name}_{uuid.uuid4().hex[:8]}"[:63]
+
+    try:
+        # -----------------------
+        # Staging table
+        # -----------------------
+        with engine.connect() as conn:
+            exists = inspect(conn).has_table(table_name, schema=schema)
+
+        if exists and if_exists == "fail":
+            raise ValueError(f"Table {schema}.{table_name} already exists")
+
+        # A staging table that will be renamed onto the target must be logged;
+        # one that is only copied from can skip the WAL
+        swap = if_exists == "replace" or not exists
+        template.to_sql(name=stage_table, con=engine, schema=schema, if_exists="fail", index=False, dtype=dtype_map)
+        if not swap:
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {schema}."{stage_table}" SET UNLOGGED'))
+
+        # -----------------------
+        # Parallel COPY
+        # -----------------------
+        work = queue.Queue(maxsize=2 * n_workers)  # bounds memory for chunk streams
+        abort = threading.Event()
+        stats = [None] * n_workers
+        errors = []
+        workers = [
+            threading.Thread(
+                target=_load_worker,
+                args=(i, engine, f'{schema}."{stage_table}"', work, abort, stats, errors),
+                daemon=True
+            )
+            for i in range(n_workers)
+        ]
+
+        start = perf_counter()
+        for worker in workers:
+            worker.start()
+        try:
+            for chunk in chunks:
+                if abort.is_set():
+                    break
+                work.put(chunk)
+        finally:
+            for _ in workers:
+                work.put(_STOP)
+            for worker in workers:
+                worker.join()
+        copy_seconds = perf_counter() - start
+
+        if errors:
+            raise errors[0]
+
+        # -----------------------
+        # All-or-nothing publish
+        # -----------------------
+        start = perf_counter()
+        with engine.begin() as conn:
+            if batch_id is not None and not claim_batch(conn, table_name, batch_id, schema):
+                logger.warning(f"Batch {batch_id} already loaded into {schema}.{table_name}, skipping")
+                return {"rows": 0, "copy_seconds": copy_seconds, "publish_seconds": 0.0, "workers": stats}
+
+            exists = inspect(conn).has_table(table_name, schema=schema)
+
+            if exists and if_exists == "fail":
+                raise ValueError(f"Table {schema}.{table_name} already exists")
+
+            if if_exists == "replace":
+                forget_batches(conn, table_name, schema)
+
+            if exists and if_exists == "append":
+                # Also covers a target created by another writer since staging began
+                columns = _column_list(template.columns)
+                conn.execute(text(f"""
+                                  INSERT INTO {schema}.{table_name} ({columns})
+                                  SELECT {columns} FROM {schema}."{stage_table}";
+                                  """))
+                conn.execute(text(f'DROP TABLE {schema}."{stage_table}"'))
+            else:
+                if exists:
+                    conn.execute(text(f"DROP TABLE {schema}.{table_name}"))
+                if not swap:
+                    conn.execute(text(f'ALTER TABLE {schema}."{stage_table}" SET LOGGED'))
+                conn.execute(text(f'ALTER TABLE {schema}."{stage_table}" RENAME TO "{table_name}"'))
+
+            if primary_key and if_exists != "append":
+                logger.info(f"Setting primary key on {primary_key} for table {table_name}")
+                conn.execute(text(f"""
+                                  ALTER TABLE {schema}.{table_name}
+                                  ADD PRIMARY KEY ({primary_key});
+                                  """))
+
+            bump_table_version(conn, table_name, schema)
+        publish_seconds = perf_counter() - start
+
+        total_rows = 0
+        for worker_stats in stats:
+            worker_stats["rows_per_sec"] = (
+                worker_stats["rows"] / worker_stats["seconds"] if worker_stats["seconds"] else 0.0
+            )
+            total_rows += worker_stats["rows"]
+            logger.info(
+                f"Worker {worker_stats['worker']} | Chunks: {worker_stats['chunks']} | "
+                f"Rows: {worker_stats['rows']} | {worker_stats['rows_per_sec']:,.0f} rows/s"
+            )
+
+        total_seconds = copy_seconds + publish_seconds
+        logger.info(
+            f"Successfully loaded {total_rows} rows into {schema}.{table_name} | "
+            f"Parallel COPY: {copy_seconds:.2f}s | Publish: {publish_seconds:.2f}s | "
+            f"End to end: {total_rows / total_seconds if total_seconds else 0:,.0f} rows/s"
+        )
+        return {
+            "rows": total_rows,
+            "copy_seconds": copy_seconds,
+            "publish_seconds": publish_seconds,
+            "workers": stats
+        }
+
+    except Exception as e:
+        logger.error(f"Error in parallel load into PostgreSQL: {e}")
+        raise
+
+    finally:
+        # The staging table is renamed or dropped on success; clean it up on failure
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE IF EXISTS {schema}."{stage_table}"'))
+        engine.dispose()
+        logger.info("PostgreSQL connection closed")
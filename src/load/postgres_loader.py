@@ -1,5 +1,5 @@
 import pandas as pd
-from sqlalchemy import create_engine, types
+from sqlalchemy import create_engine, inspect, types
 from sqlalchemy.engine import Engine
 from src.utils.config import POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB
 from src.utils.logger import get_logger
@@ -8,24 +8,110 @@ from sqlalchemy import text
 logger = get_logger(__name__)
 
 
-def _create_engine() -> Engine:
+def _create_engine(**engine_kwargs) -> Engine:
     """
     Creates a SQLAlchemy engine for PostgreSQL.
+    Extra keyword arguments (e.g. pool_size) are passed to create_engine.
     """
     logger.info("Creating PostgreSQL engine")
     connection_string = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-    engine = create_engine(connection_string)
+    engine = create_engine(connection_string, **engine_kwargs)
     logger.info("PostgreSQL engine created successfully")
     return engine
 
 
+def bump_table_version(conn, table_name: str, schema: str = "public") -> None:
+    """
+    Increments the version of a warehouse table in {schema}.etl_table_versions.
+
+    Readers key their caches on these versions, so every write to a table
+    must bump it inside the same transaction.
+    """
+    conn.execute(text(f"""
+                      CREATE TABLE IF NOT EXISTS {schema}.etl_table_versions (
+                          table_name TEXT PRIMARY KEY,
+                          version BIGINT NOT NULL,
+                          updated_at TIMESTAMP NOT NULL DEFAULT now()
+                      );
+                      """))
+    conn.execute(
+        text(f"""
+             INSERT INTO {schema}.etl_table_versions (table_name, version, updated_at)
+             VALUES (:table_name, 1, now())
+             ON CONFLICT (table_name)
+             DO UPDATE SET version = {schema}.etl_table_versions.version + 1, updated_at = now();
+             """),
+        {"table_name": table_name}
+    )
+
+
+def _ensure_loaded_batches(conn, schema: str) -> None:
+    conn.execute(text(f"""
+                      CREATE TABLE IF NOT EXISTS {schema}.etl_loaded_batches (
+                          table_name TEXT NOT NULL,
+                          batch_id TEXT NOT NULL,
+                          loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+                          PRIMARY KEY (table_name, batch_id)
+                      );
+                      """))
+
+
+def claim_batch(conn, table_name: str, batch_id: str, schema: str = "public") -> bool:
+    """
+    Records batch_id (e.g. a raw file and byte range) as loaded into a table
+    in {schema}.etl_loaded_batches.
+
+    Must run inside the transaction that writes the batch. Returns False if
+    the batch was already loaded, so a retried micro-batch is skipped
+    instead of appended twice.
+    """
+    _ensure_loaded_batches(conn, schema)
+    claimed = conn.execute(
+        text(f"""
+             INSERT INTO {schema}.etl_loaded_batches (table_name, batch_id)
+             VALUES (:table_name, :batch_id)
+             ON CONFLICT DO NOTHING
+             RETURNING batch_id;
+             """),
+        {"table_name": table_name, "batch_id": batch_id}
+    ).first()
+    return claimed is not None
+
+
+def forget_batches(conn, table_name: str, schema: str = "public") -> None:
+    """Clears the loaded batches of a table, e.g. when it is replaced."""
+    _ensure_loaded_batches(conn, schema)
+    conn.execute(
+        text(f"DELETE FROM {schema}.etl_loaded_batches WHERE table_name = :table_name"),
+        {"table_name": table_name}
+    )
+
+
+def get_table_versions(conn, table_names: list[str], schema: str = "public") -> dict:
+    """
+    Returns {table_name: version} for the requested tables (0 if never loaded).
+    """
+    versions = {name: 0 for name in table_names}
+
+    if not inspect(conn).has_table("etl_table_versions", schema=schema):
+        return versions
+
+    rows = conn.execute(
+        text(f"SELECT table_name, version FROM {schema}.etl_table_versions WHERE table_name = ANY(:names)"),
+        {"names": list(table_names)}
+    )
+    versions.update({name: version for name, version in rows})
+    return versions
+
+
 def load_to_postgres(
     df: pd.DataFrame,
     table_name: str,
     schema: str = "public",
     if_exists: str = "replace",
     primary_key: str = None,
-    dtype_map: dict = None
+    dtype_map: dict = None,
+    batch_id: str = None
 ) -> None:
     """
     Loads a DataFrame into PostgreSQL with optional primary key and type mapping.
@@ -37,6 +123,7 @@ def load_to_postgres(
         if_exists (str): 'replace', 'append', or 'fail'
         primary_key (str): Column to set as primary key (for new tables)
         dtype_map (dict): Optional dict {col_name: sqlalchemy_type} for type enforcement
+        batch_id (str): Optional micro-batch id; a batch already loaded into the table is skipped
     """
     logger.info(f"Starting load to PostgreSQL | Table: {schema}.{table_name} | Mode: {if_exists}")
     engine = _create_engine()
@@ -45,26 +132,37 @@ def load_to_postgres(
         # Apply SQLAlchemy types if provided
         sql_dtype = dtype_map if dtype_map else None
 
-        df.to_sql(
-            name=table_name,
-            con=engine,
-            schema=schema,
-            if_exists=if_exists,
-            index=False,
-            method="multi",
-            chunksize=1000,
-            dtype=sql_dtype
-        )
-
-        if primary_key and if_exists != "append":
-            # Set primary key if table is created or replaced
-            with engine.begin() as conn:
+        # Table write, primary key and version bump commit together, so
+        # readers never see new rows under the old version
+        with engine.begin() as conn:
+            if batch_id is not None and not claim_batch(conn, table_name, batch_id, schema):
+                logger.warning(f"Batch {batch_id} already loaded into {schema}.{table_name}, skipping")
+                return
+
+            if if_exists == "replace":
+                forget_batches(conn, table_name, schema)
+
+            df.to_sql(
+                name=table_name,
+                con=conn,
+                schema=schema,
+                if_exists=if_exists,
+                index=False,
+                method="multi",
+                chunksize=1000,
+                dtype=sql_dtype
+            )
+
+            if primary_key and if_exists != "append":
+                # Set primary key if table is created or replaced
                 logger.info(f"Setting primary key on {primary_key} for table {table_name}")
                 conn.execute(text(f"""
                                   ALTER TABLE {schema}.{table_name}
                                   ADD PRIMARY KEY ({primary_key});
                                   """))
 
+            bump_table_version(conn, table_name, schema)
+
         logger.info(f"Successfully loaded {df.shape[0]} rows into {schema}.{table_name}")
 
     except Exception as e:
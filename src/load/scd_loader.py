@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Boolean, TIMESTAMP, inspect, text
+
+from src.load.postgres_loader import _create_engine, bump_table_version
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def compute_attribute_hash(df: pd.DataFrame, attribute_columns: list[str]) -> np.ndarray:
+    """
+    Computes a stable 64-bit hash per row over the tracked attribute columns.
+
+    Values are compared as strings, so columns whose dtype can drift between
+    batches must be normalised by the loader first (see load_customers for
+    Postal Code); otherwise e.g. "10024.0" and "10024" hash differently.
+
+    Returns:
+        np.ndarray: int64 hashes (fits a PostgreSQL BIGINT)
+    """
+    hashes = pd.util.hash_pandas_object(
+        df[attribute_columns].astype(str),
+        index=False
+    )
+    return hashes.to_numpy(dtype=np.uint64).view(np.int64)
+
+
+def _ensure_dimension_table(conn, df: pd.DataFrame, table_name: str, schema: str, business_key: str) -> None:
+    """
+    Creates the dimension table and its current-version index if missing.
+    """
+    if inspect(conn).has_table(table_name, schema=schema):
+        return
+
+    logger.info(f"Creating SCD2 dimension table {schema}.{table_name}")
+    df.head(0).to_sql(
+        name=table_name,
+        con=conn,
+        schema=schema,
+        if_exists="fail",
+        index=False,
+        dtype={
+            "attr_hash": BigInteger,
+            "valid_from": TIMESTAMP,
+            "valid_to": TIMESTAMP,
+            "is_current": Boolean
+        }
+    )
+
+    # One current row per business key; keeps the diff lookup and expiry index-only
+    conn.execute(text(f"""
+                      CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_current_key_idx
+                      ON {schema}.{table_name} ("{business_key}")
+                      WHERE is_current;
+                      """))
+
+
+def load_scd2_dimension(
+    df: pd.DataFrame,
+    table_name: str,
+    business_key: str,
+    attribute_columns: list[str],
+    schema: str = "public",
+    effective_at: pd.Timestamp = None
+) -> dict:
+    """
+    Maintains a type-2 slowly-changing dimension by attribute hash diff.
+
+    Only new keys and keys whose attribute hash differs from the current
+    version are written: the current version is closed (valid_to set,
+    is_current false) and a new version is inserted. Keys absent from the
+    input are left untouched, so partial (incremental) inputs are safe.
+
+    Args:
+        df (pd.DataFrame): Latest attributes, one row per business key
+        table_name (str): Target dimension table
+        business_key (str): Natural key column (e.g. "Customer ID")
+        attribute_columns (list[str]): Columns whose changes create a new version
+        schema (str): Target schema
+        effective_at (pd.Timestamp): valid_from of new versions (defaults to now)
+
+    Returns:
+        dict: Counts of new, changed and unchanged keys
+    """
+    logger.info(f"Starting SCD2 load | Table: {schema}.{table_name} | Key: {business_key}")
+
+    duplicated = df[business_key].duplicated()
+    if duplicated.any():
+        logger.error(f"Input contains {duplicated.sum()} duplicate {business_key} values")
+        raise ValueError(f"Input for SCD2 load must have one row per {business_key}")
+
+    effective_at = effective_at if effective_at is not None else pd.Timestamp.now(tz=None)
+
+    incoming = df[[business_key] + attribute_columns].copy()
+    incoming["attr_hash"] = compute_attribute_hash(incoming, attribute_columns)
+
+    engine = _create_engine()
+
+    try:
+        with engine.begin() as conn:
+            template = incoming.assign(valid_from=effective_at, valid_to=pd.NaT, is_current=True)
+            _ensure_dimension_table(conn, template, table_name, schema, business_key)
+
+            # Narrow read of the incoming keys' current versions only: (key, hash),
+            # so the cost follows the batch size, not the dimension size
+            current = pd.read_sql(
+                text(f"""
+                     SELECT "{business_key}", attr_hash FROM {schema}.{table_name}
+                     WHERE is_current AND "{business_key}" = ANY(:keys)
+                     """),
+                conn,
+                params={"keys": incoming[business_key].tolist()}
+            )
+            # Nullable integers keep the 64-bit hashes exact through the left join
+            current["attr_hash"] = current["attr_hash"].astype("Int64")
+
+            diff = incoming.merge(
+                current,
+                on=business_key,
+                how="left",
+                suffixes=("", "_current"),
+                indicator=True
+            )
+            is_new = (diff["_merge"] == "left_only").to_numpy()
+            is_changed = (~is_new) & (
+                (diff["attr_hash"] != diff["attr_hash_current"]).fillna(False).to_numpy(dtype=bool)
+            )
+
+            changed_keys = diff.loc[is_changed, business_key].tolist()
+            versions = incoming[is_new | is_changed]
+
+            if changed_keys:
+                conn.execute(
+                    text(f"""
+                         UPDATE {schema}.{table_name}
+                         SET valid_to = :effective_at, is_current = false
+                         WHERE is_current AND "{business_key}" = ANY(:keys)
+                         """),
+                    {"effective_at": effective_at.to_pydatetime(), "keys": changed_keys}
+                )
+
+            if not versions.empty:
+                versions.assign(
+                    valid_from=effective_at,
+                    valid_to=pd.NaT,
+                    is_current=True
+                ).to_sql(
+                    name=table_name,
+                    con=conn,
+                    schema=schema,
+                    if_exists="append",
+                    index=False,
+                    method="multi",
+                    chunksize=1000
+                )
+                bump_table_version(conn, table_name, schema)
+
+        stats = {
+            "new": int(is_new.sum()),
+            "changed": int(is_changed.sum()),
+            "unchanged": int(len(incoming) - is_new.sum() - is_changed.sum())
+        }
+        logger.info(
+            f"SCD2 load completed for {schema}.{table_name} | "
+            f"New: {stats['new']} | Changed: {stats['changed']} | Unchanged: {stats['unchanged']}"
+        )
+        return stats
+
+    except Exception as e:
+        logger.error(f"Error maintaining SCD2 dimension {schema}.{table_name}: {e}")
+        raise
+
+    finally:
+        engine.dispose()
+        logger.info("PostgreSQL connection closed")
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from sqlalchemy.engine import Engine
+
+from src.load.postgres_loader import _create_engine, get_table_versions
+from src.utils.config import WAREHOUSE_CACHE_DIR
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# PostgreSQL type OIDs -> Arrow types; anything else is read as string
+_PG_TYPE_TO_ARROW = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    700: pa.float32(),
+    701: pa.float64(),
+    1700: pa.float64(),
+    1082: pa.date32(),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+}
+
+
+def _project(query: str, columns: list[str] = None) -> str:
+    """
+    Wraps a query so only the requested columns are sent by the server.
+    """
+    if not columns:
+        return query
+    projection = ", ".join(f'"{col}"' for col in columns)
+    return f"SELECT {projection} FROM ({query}) AS q"
+
+
+def _describe(cursor, query: str, params: dict = None) -> pa.Schema:
+    """
+    Resolves the Arrow schema of a query without fetching any rows.
+    """
+    cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0", params)
+    return pa.schema([
+        (col.name, _PG_TYPE_TO_ARROW.get(col.type_code, pa.string()))
+        for col in cursor.description
+    ])
+
+
+def _to_arrow(values: tuple, arrow_type: pa.DataType) -> pa.Array:
+    """
+    Converts one fetched column to Arrow. psycopg2 returns NUMERIC as
+    Decimal, which Arrow only accepts as decimal128, so floating columns
+    are inferred first and then cast.
+    """
+    if pa.types.is_floating(arrow_type):
+        return pa.array(values).cast(arrow_type)
+    return pa.array(values, type=arrow_type)
+
+
+def _stream_cursor(engine: Engine, query: str, params: dict, batch_size: int) -> Iterator[pa.RecordBatch]:
+    """
+    Streams rows through a server-side (named) cursor in bounded batches.
+    """
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            schema = _describe(cursor, query, params)
+
+        with conn.cursor(name=f"warehouse_reader_{uuid.uuid4().hex}") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(query, params)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                yield pa.RecordBatch.from_arrays(
+                    [_to_arrow(col, field.type) for col, field in zip(columns, schema)],
+                    schema=schema
+                )
+    finally:
+        conn.close()
+
+
+def _stream_copy(engine: Engine, query: str, params: dict, block_size: int) -> Iterator[pa.RecordBatch]:
+    """
+    Streams COPY ... TO STDOUT through a pipe into Arrow's CSV reader.
+
+    The server writes CSV on a background thread while Arrow parses it in
+    blocks of block_size bytes, so no Python row objects are created and
+    memory stays bounded by the pipe buffer plus one block.
+    """
+    conn = engine.raw_connection()
+    errors = []
+    producer = None
+
+    try:
+        with conn.cursor() as cursor:
+            schema = _describe(cursor, query, params)
+            bound_query = cursor.mogrify(query, params).decode("utf-8")
+
+        copy_sql = f"COPY ({bound_query}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+        read_fd, write_fd = os.pipe()
+
+        def _produce():
+            try:
+                with os.fdopen(write_fd, "wb") as sink, conn.cursor() as cursor:
+                    cursor.copy_expert(copy_sql, sink)
+            except Exception as e:  # surfaced to the consumer below
+                errors.append(e)
+
+        producer = threading.Thread(target=_produce, daemon=True)
+        producer.start()
+
+        # Closing the read end first makes an abandoned COPY fail fast with a broken pipe
+        with os.fdopen(read_fd, "rb") as source:
+            try:
+                reader = pa_csv.open_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(block_size=block_size),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types=schema,
+                        true_values=["t"],
+                        false_values=["f"],
+                        # COPY writes NULL unquoted and empty strings quoted
+                        strings_can_be_null=True,
+                        quoted_strings_can_be_null=False
+                    )
+                )
+                for batch in reader:
+                    yield batch
+            except pa.ArrowInvalid:
+                producer.join()
+                if errors:
+                    raise errors[0]
+                raise
+
+        producer.join()
+        if errors:
+            raise errors[0]
+
+    finally:
+        if producer is not None:
+            producer.join()
+        conn.close()
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _cache_path(query: str, params: dict, versions: dict) -> Path:
+    """<query digest>_<versions digest>.arrow, so older versions of a result share a prefix."""
+    query_key = _digest({"query": query, "params": params, "tables": sorted(versions)})
+    return WAREHOUSE_CACHE_DIR / f"{query_key}_{_digest(versions)}.arrow"
+
+
+def _evict_stale(file_path: Path) -> None:
+    """Removes cached results of the same query at older table versions."""
+    query_key = file_path.name.split("_", 1)[0]
+    for stale_path in file_path.parent.glob(f"{query_key}_*.arrow"):
+        if stale_path != file_path:
+            stale_path.unlink(missing_ok=True)
+
+
+def _read_cache(file_path: Path) -> Iterator[pa.RecordBatch]:
+    with pa.memory_map(str(file_path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def _write_through_cache(batches: Iterator[pa.RecordBatch], file_path: Path) -> Iterator[pa.RecordBatch]:
+    """
+    Yields batches while writing them to an Arrow IPC file; the file only
+    becomes visible once the whole result has been written, and then
+    replaces the cached results of older table versions.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    writer = None
+
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_file(str(tmp_path), batch.schema)
+            writer.write_batch(batch)
+            yield batch
+
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, file_path)
+            _evict_stale(file_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def iter_query_batches(
+    query: str,
+    params: dict = None,
+    columns: list[str] = None,
+    method: str = "copy",
+    batch_size: int = 100_000,
+    block_size: int = 16 << 20,
+    cache_tables: list[str] = None,
+    schema: str = "public"
+) -> Iterator[pa.RecordBatch]:
+    """
+    Streams a warehouse query as Arrow record batches.
+
+    Args:
+        query (str): SQL query (psycopg2 %(name)s parameters)
+        params (dict): Query parameters
+        columns (list[str]): Optional column projection
+        method (str): "copy" (COPY TO STDOUT + Arrow CSV) or "cursor" (server-side cursor)
+        batch_size (int): Rows per batch for the cursor method
+        block_size (int): Bytes per parsed block for the copy method
+        cache_tables (list[str]): Tables the query reads; enables the local
+            result cache, keyed by query, params and these tables' versions
+        schema (str): Schema holding etl_table_versions
+
+    Yields:
+        pa.RecordBatch: Result batches
+    """
+    valid_methods = {"copy", "cursor"}
+    if method not in valid_methods:
+        logger.error(f"Invalid read method: {method}")
+        raise ValueError(f"method must be one of {valid_methods}")
+
+    query = _project(query, columns)
+    engine = _create_engine()
+
+    try:
+        file_path = None
+        if cache_tables:
+            with engine.connect() as conn:
+                versions = get_table_versions(conn, cache_tables, schema)
+            file_path = _cache_path(query, params, versions)
+
+            if file_path.exists():
+                logger.info(f"Warehouse cache hit | Tables: {cache_tables} | Versions: {versions}")
+                yield from _read_cache(file_path)
+                return
+
+        logger.info(f"Streaming warehouse query | Method: {method}")
+
+        if method == "copy":
+            batches = _stream_copy(engine, query, params, block_size)
+        else:
+            batches = _stream_cursor(engine, query, params, batch_size)
+
+        if file_path is not None:
+            batches = _write_through_cache(batches, file_path)
+
+        yield from batches
+
+    finally:
+        engine.dispose()
+
+
+def read_query(query: str, params: dict = None, **kwargs) -> pa.Table:
+    """
+    Reads a full query result into an Arrow table. See iter_query_batches.
+    """
+    batches = list(iter_query_batches(query, params, **kwargs))
+    if not batches:
+        return pa.table({})
+
+    table = pa.Table.from_batches(batches)
+    logger.info(f"Read {table.num_rows} rows | Columns: {table.num_columns}")
+    return table
+
+
+def read_table(
+    table_name: str,
+    schema: str = "public",
+    columns: list[str] = None,
+    where: str = None,
+    params: dict = None,
+    use_cache: bool = True,
+    **kwargs
+) -> pa.Table:
+    """
+    Reads a warehouse table (optionally filtered and projected) into Arrow.
+
+    Results are cached locally and reused until a pipeline run bumps the
+    table's version.
+    """
+    query = f"SELECT * FROM {schema}.{table_name}"
+    if where:
+        query += f" WHERE {where}"
+
+    return read_query(
+        query,
+        params,
+        columns=columns,
+        cache_tables=[table_name] if use_cache else None,
+        schema=schema,
+        **kwargs
+    )
+
+
+def to_numpy_columns(data: pa.Table | pa.RecordBatch) -> dict[str, np.ndarray]:
+    """
+    Converts Arrow columns to NumPy arrays (zero-copy for null-free numerics).
+    """
+    return {
+        name: column.to_numpy(zero_copy_only=False)
+        for name, column in zip(data.column_names, data.columns)
+    }
+
+
+def clear_warehouse_cache() -> int:
+    """
+    Deletes all cached query results. Returns the number of files removed.
+    """
+    if not WAREHOUSE_CACHE_DIR.exists():
+        return 0
+
+    removed = 0
+    for file_path in WAREHOUSE_CACHE_DIR.glob("*.arrow"):
+        file_path.unlink()
+        removed += 1
+
+    logger.info(f"Cleared warehouse cache | Files removed: {removed}")
+    return removed
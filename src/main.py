@@ -1,29 +1,70 @@
 from src.utils.logger import get_logger
-from src.utils.config import ENV
-from src.extract.csv_loader import load_orders, load_leads, load_customers, load_returns
+from src.utils.config import ENV, LOAD_WORKERS
+from src.extract.csv_loader import load_orders, load_leads, load_customers, load_returns, resolve_raw_file
+from src.extract.raw_watcher import RawDrop, RawFileLedger, dataset_files, watch_raw_dir
 from src.transform.case_standardizer import standardize_case
 from src.transform.data_validation import (
     validate_required_columns,
     validate_column_types,
     validate_no_nulls
 )
+from src.transform.referential_integrity import register_parent_keys, validate_foreign_keys
+from src.transform.order_keys import add_order_keys
+from src.transform.column_profiler import profile_dataframe, save_profile, load_profile
+from src.transform.feature_store import (
+    update_features_from_orders,
+    update_features_from_returns,
+    materialize_features
+)
 from src.load.postgres_loader import load_to_postgres
+from src.load.scd_loader import load_scd2_dimension
+from src.load.parallel_loader import parallel_load_to_postgres
+from src.load.warehouse_reader import read_table
 from datetime import datetime
-from src.extract.api_loader import load_exchange_rates, load_fake_store_products
+from pathlib import Path
+import argparse
+from src.extract.api_loader import load_exchange_rates, iter_fake_store_product_batches
 from sqlalchemy import String, Float, Integer, TIMESTAMP
 import pandas as pd
 
 logger = get_logger(__name__)
 
+# One id per process: a full run, or a whole watch session whose micro-batches merge into one profile
+RUN_ID = datetime.now().strftime("%Y%m%dT%H%M%S")
+
+
+def _emit_profile(df: pd.DataFrame, dataset_name: str) -> None:
+    """
+    Profile a validated DataFrame and persist it under the current run id.
+    Micro-batches within the same run are merged into one profile.
+    """
+    try:
+        profile = load_profile(dataset_name, RUN_ID)
+    except FileNotFoundError:
+        profile = None
+    profile = profile_dataframe(df, dataset_name, profile)
+    save_profile(profile, RUN_ID)
+
+
+def _batch_id(file_path: Path, byte_range: tuple[int, int]) -> str | None:
+    """Identifies a micro-batch by raw file and byte range, so a retried append is skipped."""
+    if byte_range is None:
+        return None
+    return f"{file_path.name}:{byte_range[0]}-{byte_range[1]}"
 
-def etl_orders():
-    """ETL pipeline for orders fact table (fact table only)."""
+
+def etl_orders(file_path: Path = None, byte_range: tuple[int, int] = None, if_exists: str = None):
+    """
+    ETL pipeline for orders fact table (fact table only).
+    file_path / byte_range restrict the run to one raw drop (micro-batch).
+    """
     logger.info("Starting ETL for Orders")
+    if_exists = if_exists or ("replace" if ENV == "dev" else "append")
 
     # -----------------------
     # Extract
     # -----------------------
-    orders = load_orders()
+    orders = load_orders(file_path, byte_range)
 
     # -----------------------
     # Transform
@@ -62,24 +103,49 @@ def etl_orders():
         critical_columns=["Order ID", "Sales", "Customer ID"]
     )
 
+    # Fixed-width integer join key for orders, returns and features
+    add_order_keys(orders)
+
+    # Every order must reference a known customer; returns are checked against these Order IDs
+    validate_foreign_keys(orders, column="Customer ID", parent_name="customers.Customer ID")
+    register_parent_keys("orders.Order ID", orders["Order ID"])
+
+    _emit_profile(orders, "orders")
+
     # -----------------------
     # Load
     # -----------------------
-    load_to_postgres(
-        df=orders,
-        table_name="orders",
-        schema="public",
-        if_exists="replace" if ENV == "dev" else "append"
-    )
+    if LOAD_WORKERS > 1:
+        parallel_load_to_postgres(
+            data=orders,
+            table_name="orders",
+            schema="public",
+            if_exists=if_exists,
+            n_workers=LOAD_WORKERS,
+            batch_id=_batch_id(file_path, byte_range)
+        )
+    else:
+        load_to_postgres(
+            df=orders,
+            table_name="orders",
+            schema="public",
+            if_exists=if_exists,
+            batch_id=_batch_id(file_path, byte_range)
+        )
+
+    # -----------------------
+    # Features
+    # -----------------------
+    update_features_from_orders(orders, replace=if_exists == "replace")
 
     logger.info("ETL for Orders completed successfully")
 
 
-def etl_customers():
-    """ETL pipeline for customers dimension table."""
+def etl_customers(file_path: Path = None, byte_range: tuple[int, int] = None):
+    """ETL pipeline for customers dimension table (type-2 slowly-changing)."""
     logger.info("Starting ETL for Customers")
 
-    customers = load_customers()
+    customers = load_customers(file_path, byte_range)
 
     customers = standardize_case(
         df=customers,
@@ -109,21 +175,27 @@ def etl_customers():
         critical_columns=["Customer ID", "Customer Name"]
     )
 
-    load_to_postgres(
+    register_parent_keys("customers.Customer ID", customers["Customer ID"])
+
+    _emit_profile(customers, "customers")
+
+    # Type-2 dimension: only new or changed customers are written
+    load_scd2_dimension(
         df=customers,
-        table_name="customers",
-        schema="public",
-        if_exists="replace" if ENV == "dev" else "append"
+        table_name="dim_customers",
+        business_key="Customer ID",
+        attribute_columns=["Customer Name", "Segment", "City", "State", "Region", "Postal Code", "Country"],
+        schema="public"
     )
 
     logger.info("ETL for Customers completed successfully")
 
 
-def etl_leads():
-    """ETL pipeline for leads from people.csv."""
+def etl_leads(file_paths: list[Path] = None):
+    """ETL pipeline for leads from people.csv (or every people file)."""
     logger.info("Starting ETL for Leads")
 
-    leads = load_leads()
+    leads = load_leads(file_paths)
 
     leads = standardize_case(
         df=leads,
@@ -143,25 +215,27 @@ def etl_leads():
     }
     validate_column_types(leads, expected_types)
 
+    _emit_profile(leads, "leads")
+
     load_to_postgres(
         df=leads,
         table_name="leads",
         schema="public",
-        if_exists="replace" if ENV == "dev" else "append"
+        # Lead IDs are positional, so leads are always reloaded as a whole
+        if_exists="replace" if ENV == "dev" or file_paths is not None else "append"
     )
 
     logger.info("ETL for Leads completed successfully")
 
-def etl_returns():
+def etl_returns(file_path: Path = None, byte_range: tuple[int, int] = None, if_exists: str = None):
     """ETL pipeline for returns table."""
-    from src.extract.csv_loader import load_returns
-
     logger.info("Starting ETL for Returns")
+    if_exists = if_exists or ("replace" if ENV == "dev" else "append")
 
     # -----------------------
     # Extract
     # -----------------------
-    returns = load_returns()
+    returns = load_returns(file_path, byte_range)
 
     # -----------------------
     # Validate
@@ -182,6 +256,11 @@ def etl_returns():
         critical_columns=["Order ID", "Returned"]
     )
 
+    validate_foreign_keys(returns, column="Order ID", parent_name="orders.Order ID")
+    add_order_keys(returns)
+
+    _emit_profile(returns, "returns")
+
     # -----------------------
     # Load
     # -----------------------
@@ -189,9 +268,15 @@ def etl_returns():
         df=returns,
         table_name="returns",
         schema="public",
-        if_exists="replace" if ENV == "dev" else "append"
+        if_exists=if_exists,
+        batch_id=_batch_id(file_path, byte_range)
     )
 
+    # -----------------------
+    # Features
+    # -----------------------
+    update_features_from_returns(returns, replace=if_exists == "replace")
+
     logger.info("ETL for Returns completed successfully")
 
 def etl_exchange_rates():
@@ -223,6 +308,8 @@ def etl_exchange_rates():
     validate_column_types(rates_df, expected_types)
     validate_no_nulls(rates_df, ["currency", "rate"])
 
+    _emit_profile(rates_df, "exchange_rates")
+
     # -----------------------
     # Load
     # -----------------------
@@ -244,29 +331,25 @@ def etl_exchange_rates():
 
 
 def etl_fake_store_products():
-    """ETL pipeline for Fake Store API products."""
-    logger.info("Starting ETL for Fake Store Products")
-
-    # -----------------------
-    # Extract
-    # -----------------------
-    products_df = load_fake_store_products()
+    """
+    ETL pipeline for Fake Store API products.
 
-    # -----------------------
-    # Transform
-    # -----------------------
-    # Separate rating dict into two columns: rating_rate, rating_count
-    if "rating" in products_df.columns:
-        products_df["rating_rate"] = products_df["rating"].apply(lambda x: x.get("rate") if isinstance(x, dict) else None)
-        products_df["rating_count"] = products_df["rating"].apply(lambda x: x.get("count") if isinstance(x, dict) else None)
-        products_df = products_df.drop(columns=["rating"])
+    Pages are fetched in the background while earlier batches are validated
+    and loaded, so memory stays bounded by the batch size.
+    """
+    logger.info("Starting ETL for Fake Store Products")
 
-    # -----------------------
-    # Validate
-    # -----------------------
+    dtype_map = {
+        "id": Integer,
+        "title": String,
+        "price": Float,
+        "description": String,
+        "category": String,
+        "image": String,
+        "rating_rate": Float,
+        "rating_count": Integer
+    }
     required_cols = ["id", "title", "price", "category", "rating_rate", "rating_count"]
-    validate_required_columns(products_df, required_cols)
-
     expected_types = {
         "id": "int64",
         "title": "object",
@@ -275,41 +358,124 @@ def etl_fake_store_products():
         "rating_rate": "float64",
         "rating_count": "int64"
     }
-    validate_column_types(products_df, expected_types)
-    validate_no_nulls(products_df, ["id", "title", "price"])
+
+    profile = None
+    total_rows = 0
+
+    def validated_batches():
+        nonlocal profile, total_rows
+
+        # -----------------------
+        # Extract
+        # -----------------------
+        # The rating dict is flattened into rating_rate / rating_count by the source
+        for products_df in iter_fake_store_product_batches():
+
+            # -----------------------
+            # Validate
+            # -----------------------
+            validate_required_columns(products_df, required_cols)
+            validate_column_types(products_df, expected_types)
+            validate_no_nulls(products_df, ["id", "title", "price"])
+
+            profile = profile_dataframe(products_df, "fake_store_products", profile)
+            total_rows += len(products_df)
+            yield products_df
 
     # -----------------------
     # Load
     # -----------------------
-    dtype_map = {
-        "id": Integer,
-        "title": String,
-        "price": Float,
-        "description": String,
-        "category": String,
-        "image": String,
-        "rating_rate": Float,
-        "rating_count": Integer
-    }
-
-    load_to_postgres(
-        df=products_df,
+    # Batches are staged and published in one transaction, so a page that
+    # fails to fetch or validate leaves the previous table untouched
+    parallel_load_to_postgres(
+        data=validated_batches(),
         table_name="fake_store_products",
         schema="public",
         if_exists="replace" if ENV == "dev" else "append",
+        n_workers=LOAD_WORKERS,
         primary_key="id",
         dtype_map=dtype_map
     )
 
-    logger.info("ETL for Fake Store Products completed successfully")
+    if profile is not None:
+        save_profile(profile, RUN_ID)
+
+    logger.info(f"ETL for Fake Store Products completed successfully | Rows: {total_rows}")
+
+def process_raw_drop(drop: RawDrop) -> None:
+    """
+    Runs only the ETL stages affected by one raw drop, as a micro-batch.
+
+    Safe to retry: fact appends are keyed by file and byte range, the
+    customer dimension and feature store only apply changes they have not
+    seen yet.
+    """
+    if drop.dataset == "leads":
+        # Lead IDs are positional, so a new people file reloads leads from all of them
+        etl_leads(dataset_files("leads", drop.path.parent))
+        return
+
+    if drop.is_rewrite:
+        # Appending a rewritten fact file would duplicate its earlier rows, so it
+        # fails and stays pending (then quarantined) until the dataset is reloaded
+        raise ValueError(
+            f"{drop.path.name} was rewritten, not appended; run the full pipeline to reload {drop.dataset}"
+        )
+
+    if drop.dataset == "orders":
+        etl_customers(drop.path, drop.byte_range)
+        etl_orders(drop.path, drop.byte_range, if_exists="append")
+    elif drop.dataset == "returns":
+        etl_returns(drop.path, drop.byte_range, if_exists="append")
+
+    materialize_features()
+
+
+def _seed_parent_keys() -> None:
+    """Seed referential-integrity key indexes from the warehouse for micro-batches."""
+    for table_name, column in [("dim_customers", "Customer ID"), ("orders", "Order ID")]:
+        parent_name = f"{table_name.replace('dim_', '')}.{column}"
+        try:
+            keys = read_table(table_name, columns=[column]).column(column).to_pandas()
+        except Exception as e:
+            logger.warning(f"Could not seed key index {parent_name} from warehouse: {e}")
+            continue
+        register_parent_keys(parent_name, keys)
+
+
+def watch(poll_seconds: float = 30.0, once: bool = False) -> None:
+    """Watch RAW_DATA_DIR and load new raw drops as micro-batches."""
+    logger.info(f"Starting GlobalRetail 360 watch mode | ENV={ENV}")
+    _seed_parent_keys()
+    watch_raw_dir(process_raw_drop, poll_seconds=poll_seconds, once=once)
+
 
 def main():
     logger.info(f"Starting GlobalRetail 360 ETL pipeline | ENV={ENV}")
 
-    etl_orders()
-    etl_returns()
-    etl_customers()
-    etl_leads()
+    # Every raw file of a dataset is loaded, base file first, so drops that
+    # arrived between runs are not lost when dev replaces the tables
+    orders_paths = dataset_files("orders") or [resolve_raw_file("orders.csv")]
+    returns_paths = dataset_files("returns") or [resolve_raw_file("returns.csv")]
+    people_paths = dataset_files("leads") or [resolve_raw_file("people.csv")]
+
+    # Each raw file is marked processed as soon as its stage has loaded, so a
+    # later failure does not make watch mode append it a second time
+    ledger = RawFileLedger()
+
+    # Parents before children so key indexes exist for referential checks
+    for i, orders_path in enumerate(orders_paths):
+        etl_customers(orders_path)
+        etl_orders(orders_path, if_exists=None if i == 0 else "append")
+        ledger.mark_processed(orders_path)
+    for i, returns_path in enumerate(returns_paths):
+        etl_returns(returns_path, if_exists=None if i == 0 else "append")
+        ledger.mark_processed(returns_path)
+    etl_leads(people_paths)
+    for people_path in people_paths:
+        ledger.mark_processed(people_path)
+
+    materialize_features()
 
     etl_exchange_rates()
     etl_fake_store_products()
@@ -319,4 +485,13 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="GlobalRetail 360 ETL pipeline")
+    parser.add_argument("--watch", action="store_true", help="Process new raw drops as micro-batches")
+    parser.add_argument("--poll-seconds", type=float, default=30.0, help="Watch mode polling interval")
+    parser.add_argument("--once", action="store_true", help="Watch mode: process pending drops and exit")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(poll_seconds=args.poll_seconds, once=args.once)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,484 @@
+import base64
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import PROFILES_DIR
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _hash_values(series: pd.Series) -> np.ndarray:
+    """
+    Hash non-null values of a Series to uint64 with pandas' stable hasher.
+    """
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter. Registers merge with an element-wise max,
+    so sketches built on separate chunks or runs combine losslessly.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, series: pd.Series) -> None:
+        if series.empty:
+            return
+
+        hashes = _hash_values(series)
+        p = np.uint64(self.precision)
+
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        remainder = hashes << p
+
+        # Rank = position of the first set bit in the remaining 64 - p bits
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = np.where(
+            remainder == 0,
+            64 - self.precision + 1,
+            64 - bit_length + 1
+        ).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Small-range correction (linear counting)
+            raw = m * np.log(m / zeros)
+
+        return int(round(raw))
+
+    def to_dict(self) -> dict:
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HyperLogLog":
+        sketch = cls(precision=data["precision"])
+        sketch.registers = np.frombuffer(
+            base64.b64decode(data["registers"]), dtype=np.uint8
+        ).copy()
+        return sketch
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch built from a stack of compactors (KLL-style).
+
+    Level h holds items of weight 2**h; whenever a level grows beyond k items
+    it is sorted and every other item is promoted to the next level.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: list[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        self.count += int(values.size)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+
+        for height, items in enumerate(other.levels):
+            self.levels[height] = np.concatenate([self.levels[height], items])
+
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        height = 0
+        while height < len(self.levels):
+            level = self.levels[height]
+            if level.size > self.k:
+                level = np.sort(level)
+
+                # Keep one item back on odd sizes so total weight is preserved
+                carry = level[-1:] if level.size % 2 else level[:0]
+                paired = level[:level.size - carry.size]
+                offset = int(self._rng.integers(0, 2))
+
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], paired[offset::2]])
+                self.levels[height] = carry
+            height += 1
+
+    def quantiles(self, qs: list[float]) -> list[float]:
+        if self.count == 0:
+            return [None for _ in qs]
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(level.size, 2 ** height, dtype=np.float64)
+            for height, level in enumerate(self.levels)
+        ])
+
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        positions = np.clip(positions, 0, items.size - 1)
+
+        return [float(v) for v in items[positions]]
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "count": self.count,
+            "levels": [level.tolist() for level in self.levels]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(k=data["k"])
+        sketch.count = data["count"]
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in data["levels"]]
+        return sketch
+
+
+class FrequentItems:
+    """
+    Misra-Gries heavy hitters summary. Merging adds counters and then
+    subtracts the (capacity + 1)-th largest count, which keeps the summary
+    mergeable with a bounded undercount of `error`.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.error = 0
+
+    def update(self, series: pd.Series) -> None:
+        if series.empty:
+            return
+        chunk_counts = series.astype(str).value_counts()
+        self._merge_counts(dict(zip(chunk_counts.index, chunk_counts.to_numpy().tolist())))
+
+    def merge(self, other: "FrequentItems") -> None:
+        self.error += other.error
+        self._merge_counts(other.counts)
+
+    def _merge_counts(self, counts: dict) -> None:
+        combined = pd.Series(self.counts, dtype=np.int64).add(
+            pd.Series(counts, dtype=np.int64), fill_value=0
+        )
+
+        if len(combined) > self.capacity:
+            threshold = int(combined.nlargest(self.capacity + 1).iloc[-1])
+            combined = combined - threshold
+            combined = combined[combined > 0]
+            self.error += threshold
+
+        self.counts = {str(k): int(v) for k, v in combined.items()}
+
+    def top(self, n: int = 10) -> list[tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+    def to_dict(self) -> dict:
+        return {"capacity": self.capacity, "counts": self.counts, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FrequentItems":
+        sketch = cls(capacity=data["capacity"])
+        sketch.counts = {str(k): int(v) for k, v in data["counts"].items()}
+        sketch.error = data["error"]
+        return sketch
+
+
+class ColumnProfile:
+    """
+    Null count, min/max and mergeable sketches for a single column.
+    """
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind  # "numeric" or "categorical"
+        self.count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.distinct = HyperLogLog()
+        self.top_k = FrequentItems()
+        self.quantiles = QuantileSketch() if kind == "numeric" else None
+
+    @staticmethod
+    def kind_for(series: pd.Series) -> str:
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return "numeric"
+        return "categorical"
+
+    def update(self, series: pd.Series) -> None:
+        values = series.dropna()
+
+        self.count += len(series)
+        self.null_count += len(series) - len(values)
+
+        if values.empty:
+            return
+
+        if self.kind == "numeric" and self.kind_for(values) != "numeric":
+            self._to_categorical()
+
+        if self.kind == "numeric":
+            self.quantiles.update(values.to_numpy(dtype=np.float64))
+            chunk_min, chunk_max = float(values.min()), float(values.max())
+        else:
+            values = values.astype(str)
+            chunk_min, chunk_max = values.min(), values.max()
+
+        self._merge_bounds(chunk_min, chunk_max)
+        self.distinct.update(values)
+        self.top_k.update(values)
+
+    def merge(self, other: "ColumnProfile") -> None:
+        if other.kind != self.kind:
+            other = ColumnProfile.from_dict(other.to_dict())
+            self._to_categorical()
+            other._to_categorical()
+
+        self.count += other.count
+        self.null_count += other.null_count
+        if other.min is not None:
+            self._merge_bounds(other.min, other.max)
+        self.distinct.merge(other.distinct)
+        self.top_k.merge(other.top_k)
+        if self.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+
+    def _to_categorical(self) -> None:
+        """
+        Falls back to a categorical profile when chunks disagree on the
+        column type (e.g. an all-null float chunk followed by strings).
+        """
+        if self.kind == "categorical":
+            return
+
+        logger.warning(f"Column {self.name} has mixed types across chunks, profiling as categorical")
+        self.kind = "categorical"
+        self.quantiles = None
+        if self.min is not None:
+            self.min, self.max = str(self.min), str(self.max)
+
+    def _merge_bounds(self, new_min, new_max) -> None:
+        self.min = new_min if self.min is None else min(self.min, new_min)
+        self.max = new_max if self.max is None else max(self.max, new_max)
+
+    def summary(self) -> dict:
+        row = {
+            "column": self.name,
+            "kind": self.kind,
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_rate": self.null_count / self.count if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "approx_distinct": self.distinct.estimate(),
+            "top_values": self.top_k.top(5)
+        }
+        if self.quantiles is not None:
+            row["p25"], row["p50"], row["p75"] = self.quantiles.quantiles([0.25, 0.5, 0.75])
+        return row
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "count": self.count,
+            "null_count": self.null_count,
+            "min": self.min,
+            "max": self.max,
+            "distinct": self.distinct.to_dict(),
+            "top_k": self.top_k.to_dict(),
+            "quantiles": self.quantiles.to_dict() if self.quantiles is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnProfile":
+        profile = cls(name=data["name"], kind=data["kind"])
+        profile.count = data["count"]
+        profile.null_count = data["null_count"]
+        profile.min = data["min"]
+        profile.max = data["max"]
+        profile.distinct = HyperLogLog.from_dict(data["distinct"])
+        profile.top_k = FrequentItems.from_dict(data["top_k"])
+        if data["quantiles"] is not None:
+            profile.quantiles = QuantileSketch.from_dict(data["quantiles"])
+        return profile
+
+
+class TableProfile:
+    """
+    Column profiles for one dataset. Can be updated chunk by chunk and merged
+    with profiles from other chunks or runs.
+    """
+
+    def __init__(self, dataset_name: str):
+        self.dataset_name = dataset_name
+        self.row_count = 0
+        self.columns: dict[str, ColumnProfile] = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.row_count += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(col, ColumnProfile.kind_for(df[col]))
+            self.columns[col].update(df[col])
+
+    def merge(self, other: "TableProfile") -> None:
+        self.row_count += other.row_count
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = ColumnProfile.from_dict(column.to_dict())
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame([column.summary() for column in self.columns.values()])
+
+    def to_dict(self) -> dict:
+        return {
+            "dataset_name": self.dataset_name,
+            "row_count": self.row_count,
+            "columns": [column.to_dict() for column in self.columns.values()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TableProfile":
+        profile = cls(dataset_name=data["dataset_name"])
+        profile.row_count = data["row_count"]
+        profile.columns = {c["name"]: ColumnProfile.from_dict(c) for c in data["columns"]}
+        return profile
+
+
+def profile_dataframe(
+    df: pd.DataFrame,
+    dataset_name: str,
+    profile: TableProfile = None
+) -> TableProfile:
+    """
+    Profiles a DataFrame (or one chunk of a larger dataset).
+
+    Args:
+        df (pd.DataFrame): Data to profile
+        dataset_name (str): Name of the dataset being profiled
+        profile (TableProfile): Existing profile to update with this chunk
+
+    Returns:
+        TableProfile: Updated profile
+    """
+    if profile is None:
+        profile = TableProfile(dataset_name)
+
+    profile.update(df)
+    logger.info(f"Profiled {len(df)} rows for dataset: {dataset_name}")
+
+    return profile
+
+
+def save_profile(profile: TableProfile, run_id: str, profiles_dir: Path = PROFILES_DIR) -> Path:
+    """
+    Persists a profile as JSON under <profiles_dir>/<run_id>/<dataset>.json.
+    """
+    run_dir = profiles_dir / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    file_path = run_dir / f"{profile.dataset_name}.json"
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(profile.to_dict(), f)
+
+    logger.info(f"Saved profile for {profile.dataset_name} | Run: {run_id} | Path: {file_path}")
+    return file_path
+
+
+def load_profile(dataset_name: str, run_id: str, profiles_dir: Path = PROFILES_DIR) -> TableProfile:
+    """
+    Loads a previously saved profile.
+    """
+    file_path = profiles_dir / run_id / f"{dataset_name}.json"
+
+    if not file_path.exists():
+        logger.error(f"Profile not found: {file_path}")
+        raise FileNotFoundError(f"Missing profile: {file_path}")
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        return TableProfile.from_dict(json.load(f))
+
+
+def list_profile_runs(dataset_name: str, profiles_dir: Path = PROFILES_DIR) -> list[str]:
+    """
+    Returns run ids that have a saved profile for the dataset, oldest first.
+    """
+    if not profiles_dir.exists():
+        return []
+    return sorted(
+        run_dir.name for run_dir in profiles_dir.iterdir()
+        if (run_dir / f"{dataset_name}.json").exists()
+    )
+
+
+def compare_profiles(baseline: TableProfile, current: TableProfile) -> pd.DataFrame:
+    """
+    Compares two saved profiles column by column without rescanning data.
+
+    Returns:
+        pd.DataFrame: Null-rate, distinct-count and median shifts per column
+    """
+    rows = []
+    for name, column in current.columns.items():
+        previous = baseline.columns.get(name)
+        if previous is None:
+            rows.append({"column": name, "status": "added"})
+            continue
+
+        now, before = column.summary(), previous.summary()
+        row = {
+            "column": name,
+            "status": "present",
+            "null_rate_delta": now["null_rate"] - before["null_rate"],
+            "distinct_ratio": (
+                now["approx_distinct"] / before["approx_distinct"]
+                if before["approx_distinct"] else None
+            )
+        }
+        if column.kind == "numeric" and previous.kind == "numeric":
+            row["median_before"], row["median_now"] = before["p50"], now["p50"]
+        rows.append(row)
+
+    for name in baseline.columns.keys() - current.columns.keys():
+        rows.append({"column": name, "status": "removed"})
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,271 @@
+import math
+from collections import deque
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.utils.config import DEDUP_MEMORY_BUDGET_MB, PROCESSED_DATA_DIR
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SEQ_COLUMN = "_dedup_seq"
+_MAX_DEPTH = 3
+
+
+def _validate_policy(policy: str, timestamp_column: str = None) -> None:
+    valid_policies = {"first", "last", "latest"}
+    if policy not in valid_policies:
+        logger.error(f"Invalid dedup policy: {policy}")
+        raise ValueError(f"policy must be one of {valid_policies}")
+    if policy == "latest" and not timestamp_column:
+        raise ValueError("timestamp_column is required for policy='latest'")
+
+
+def _partition_ids(df: pd.DataFrame, key: list[str], n_partitions: int, depth: int) -> np.ndarray:
+    """
+    Hash-partitions rows by key. Each recursion depth uses a different hash
+    key so an oversized partition splits evenly when re-partitioned.
+    """
+    hashes = pd.util.hash_pandas_object(df[key], index=False, hash_key=f"dedup-level-{depth:04d}")
+    return (hashes.to_numpy(dtype=np.uint64) % np.uint64(n_partitions)).astype(np.int64)
+
+
+def _spill(df: pd.DataFrame, key: list[str], n_partitions: int, depth: int, spill_dir: Path, tag: str) -> dict:
+    """
+    Writes each non-empty partition of a chunk to its own parquet file.
+
+    Returns:
+        dict: {partition_id: (file_path, rows)}
+    """
+    spilled = {}
+    partition_ids = _partition_ids(df, key, n_partitions, depth)
+    for partition_id in np.unique(partition_ids):
+        part = df[partition_ids == partition_id]
+        file_path = spill_dir / f"p{partition_id:05d}_{tag}.parquet"
+        part.to_parquet(file_path, index=False)
+        spilled[int(partition_id)] = (file_path, len(part))
+    return spilled
+
+
+def _apply_policy(df: pd.DataFrame, key: list[str], policy: str, timestamp_column: str = None) -> pd.DataFrame:
+    """
+    Deduplicates one partition; input order is given by the sequence column.
+    """
+    if policy == "latest":
+        df = df.sort_values([timestamp_column, _SEQ_COLUMN], kind="stable")
+        df = df.drop_duplicates(subset=key, keep="last")
+    else:
+        df = df.sort_values(_SEQ_COLUMN, kind="stable")
+        df = df.drop_duplicates(subset=key, keep=policy)
+
+    return df.sort_values(_SEQ_COLUMN, kind="stable")
+
+
+def _dedupe_partition(
+    files: list[Path],
+    rows: int,
+    key: list[str],
+    policy: str,
+    timestamp_column: str,
+    bytes_per_row: float,
+    partition_budget: int,
+    depth: int
+) -> list[pd.DataFrame]:
+    """
+    Deduplicates one spilled partition, re-partitioning it on disk first if
+    it would not fit in its memory budget. Runs in worker processes.
+    """
+    if rows * bytes_per_row > partition_budget and depth < _MAX_DEPTH:
+        fan_out = max(2, math.ceil(rows * bytes_per_row / partition_budget))
+        sub_dir = Path(tempfile.mkdtemp(dir=files[0].parent))
+        sub_partitions: dict[int, list] = {}
+
+        try:
+            for i, file_path in enumerate(files):
+                spilled = _spill(pd.read_parquet(file_path), key, fan_out, depth + 1, sub_dir, f"{i:06d}")
+                for partition_id, (sub_path, sub_rows) in spilled.items():
+                    entry = sub_partitions.setdefault(partition_id, [[], 0])
+                    entry[0].append(sub_path)
+                    entry[1] += sub_rows
+
+            results = []
+            for sub_files, sub_rows in sub_partitions.values():
+                results.extend(_dedupe_partition(
+                    sub_files, sub_rows, key, policy, timestamp_column,
+                    bytes_per_row, partition_budget, depth + 1
+                ))
+            return results
+        finally:
+            shutil.rmtree(sub_dir, ignore_errors=True)
+
+    partition = pd.concat([pd.read_parquet(file_path) for file_path in files], ignore_index=True)
+    return [_apply_policy(partition, key, policy, timestamp_column)]
+
+
+def _run_partitions(tasks: list[tuple], n_jobs: int) -> Iterator[list[pd.DataFrame]]:
+    """
+    Runs partition dedup tasks, in worker processes when n_jobs > 1.
+    At most n_jobs partitions are in flight at once, keeping memory within budget.
+    """
+    if n_jobs == 1:
+        for task in tasks:
+            yield _dedupe_partition(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_dedupe_partition, *task))
+            if len(pending) >= n_jobs:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def dedupe_out_of_core(
+    chunks: Iterable[pd.DataFrame],
+    key: str | list[str],
+    policy: str = "first",
+    timestamp_column: str = None,
+    memory_budget_mb: int = DEDUP_MEMORY_BUDGET_MB,
+    n_partitions: int = None,
+    expected_rows: int = None,
+    n_jobs: int = 1,
+    spill_dir: Path = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Deduplicates a stream of chunks that may not fit in memory.
+
+    Rows are hash-partitioned by key into parquet spill files, so all rows
+    of a key land in the same partition. Partitions are then deduplicated
+    independently, optionally in parallel processes. A partition that turns
+    out larger than its budget is re-partitioned on disk with a new hash.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Input chunks, each small enough for memory
+        key (str | list[str]): Deduplication key column(s)
+        policy (str): "first", "last" (input order) or "latest" (by timestamp_column)
+        timestamp_column (str): Column ordering versions for policy="latest"
+        memory_budget_mb (int): Memory budget for the dedup phase
+        n_partitions (int): Number of spill partitions (derived from expected_rows if omitted)
+        expected_rows (int): Expected total row count, used to size partitions
+        n_jobs (int): Partitions deduplicated in parallel; they share the budget
+        spill_dir (Path): Parent directory for spill files
+
+    Yields:
+        pd.DataFrame: Deduplicated rows, one frame per partition
+    """
+    _validate_policy(policy, timestamp_column)
+    key = [key] if isinstance(key, str) else list(key)
+
+    n_jobs = max(1, n_jobs)
+    budget = memory_budget_mb * 1024 * 1024
+    partition_budget = budget // (2 * n_jobs)  # leave headroom for sort/dedupe copies
+
+    spill_root = spill_dir or PROCESSED_DATA_DIR / "spill"
+    spill_root.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix="dedup_", dir=spill_root))
+
+    try:
+        # -----------------------
+        # Partition and spill
+        # -----------------------
+        partitions: dict[int, list] = {}
+        bytes_per_row = None
+        total_rows = 0
+
+        for i, chunk in enumerate(chunks):
+            if chunk.empty:
+                continue
+
+            if bytes_per_row is None:
+                bytes_per_row = chunk.memory_usage(deep=True).sum() / len(chunk)
+                if n_partitions is None:
+                    estimated = (expected_rows or len(chunk)) * bytes_per_row
+                    n_partitions = max(1, math.ceil(estimated / partition_budget))
+                logger.info(
+                    f"Out-of-core dedup | Key: {key} | Policy: {policy} | "
+                    f"Partitions: {n_partitions} | Budget: {memory_budget_mb} MB"
+                )
+
+            chunk = chunk.assign(**{_SEQ_COLUMN: np.arange(total_rows, total_rows + len(chunk), dtype=np.int64)})
+            total_rows += len(chunk)
+
+            for partition_id, (file_path, rows) in _spill(chunk, key, n_partitions, 0, work_dir, f"{i:06d}").items():
+                entry = partitions.setdefault(partition_id, [[], 0])
+                entry[0].append(file_path)
+                entry[1] += rows
+
+        if not partitions:
+            return
+
+        # -----------------------
+        # Dedupe each partition
+        # -----------------------
+        tasks = [
+            (files, rows, key, policy, timestamp_column, bytes_per_row, partition_budget, 0)
+            for files, rows in partitions.values()
+        ]
+
+        kept = 0
+        for frames in _run_partitions(tasks, n_jobs):
+            for frame in frames:
+                kept += len(frame)
+                yield frame.drop(columns=[_SEQ_COLUMN])
+
+        logger.info(f"Out-of-core dedup completed | Input rows: {total_rows} | Unique rows: {kept}")
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def dedupe_csv(
+    file_path: Path,
+    key: str | list[str],
+    columns: list[str] = None,
+    policy: str = "first",
+    timestamp_column: str = None,
+    memory_budget_mb: int = DEDUP_MEMORY_BUDGET_MB,
+    n_jobs: int = 1
+) -> Iterator[pd.DataFrame]:
+    """
+    Deduplicates a CSV file under a memory budget; chunk size and partition
+    count are derived from the budget and the file size.
+    """
+    # Compressed files (.gz, .zst) are decompressed on the fly, by extension
+    with pa.input_stream(str(file_path)) as source:
+        sample = pd.read_csv(source, usecols=columns, nrows=10_000)
+    if sample.empty:
+        return
+
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    budget = memory_budget_mb * 1024 * 1024
+    chunk_rows = max(1_000, int(budget // 4 // bytes_per_row))
+
+    # Estimate the row count from the average CSV line length of the first
+    # MB; for compressed files this is a lower bound, and partitions that
+    # turn out oversized are re-partitioned
+    with pa.input_stream(str(file_path)) as source:
+        head = source.read(1 << 20)
+    expected_rows = int(file_path.stat().st_size / max(1.0, len(head) / max(1, head.count(b"\n"))))
+
+    logger.info(f"Deduplicating {file_path.name} | ~{expected_rows} rows | Chunk rows: {chunk_rows}")
+
+    with pa.input_stream(str(file_path)) as source:
+        yield from dedupe_out_of_core(
+            pd.read_csv(source, usecols=columns, chunksize=chunk_rows),
+            key=key,
+            policy=policy,
+            timestamp_column=timestamp_column,
+            memory_budget_mb=memory_budget_mb,
+            expected_rows=expected_rows,
+            n_jobs=n_jobs
+        )
@@ -0,0 +1,420 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.utils.config import FEATURE_STORE_DIR
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Entity -> key column in orders
+FEATURE_ENTITIES = {
+    "customer": "Customer ID",
+    "product": "Product ID",
+}
+
+FEATURE_WINDOWS_DAYS = (30, 90, 365)
+
+# Additive running aggregates, kept per entity per order date
+_BUCKET_COLUMNS = ["orders", "lines", "quantity", "sales", "profit", "discount_sum", "discounted_lines"]
+_COUNT_COLUMNS = ["orders", "lines", "quantity", "discounted_lines"]
+
+# Return aggregates, kept per entity per order date per date the return became known
+_RETURN_COLUMNS = ["returned_orders", "returned_lines"]
+
+_LINE_INDEX = "order_lines"
+
+# Date each returned order first became known; survives reset_feature_store
+_RETURN_DATES = "return_dates"
+_LINE_KEY = ["Order Key", "Product ID"]
+_LINE_COLUMNS = ["Order Key", "Product ID", "Customer ID", "date", "returned", "returned_at"]
+
+
+# -----------------------
+# State files
+# -----------------------
+def _state_path(name: str, store_dir: Path) -> Path:
+    return store_dir / f"{name}.parquet"
+
+
+def _returns_name(entity: str) -> str:
+    return f"{entity}_returns"
+
+
+def _empty_buckets(entity: str) -> pd.DataFrame:
+    df = pd.DataFrame(columns=[FEATURE_ENTITIES[entity], "date", *_BUCKET_COLUMNS])
+    return df.astype({"date": "datetime64[ns]", **{col: "float64" for col in _BUCKET_COLUMNS}})
+
+
+def _empty_returns(entity: str) -> pd.DataFrame:
+    df = pd.DataFrame(columns=[FEATURE_ENTITIES[entity], "date", "returned_at", *_RETURN_COLUMNS])
+    return df.astype({
+        "date": "datetime64[ns]",
+        "returned_at": "datetime64[ns]",
+        **{col: "float64" for col in _RETURN_COLUMNS}
+    })
+
+
+def _read_state(name: str, store_dir: Path) -> pd.DataFrame:
+    file_path = _state_path(name, store_dir)
+    if file_path.exists():
+        df = pd.read_parquet(file_path)
+        if name == _LINE_INDEX and "returned_at" not in df.columns:
+            df["returned_at"] = pd.NaT  # index written before returns were dated
+        return df
+    if name == _RETURN_DATES:
+        return pd.DataFrame(columns=["Order Key", "returned_at"]).astype({
+            "Order Key": "Int64",
+            "returned_at": "datetime64[ns]"
+        })
+    if name == _LINE_INDEX:
+        index = pd.DataFrame(columns=_LINE_COLUMNS)
+        return index.astype({
+            "Order Key": "Int64",
+            "date": "datetime64[ns]",
+            "returned": "bool",
+            "returned_at": "datetime64[ns]"
+        })
+    for entity in FEATURE_ENTITIES:
+        if name == _returns_name(entity):
+            return _empty_returns(entity)
+    return _empty_buckets(name)
+
+
+def _write_state(name: str, df: pd.DataFrame, store_dir: Path) -> None:
+    """Writes a state table compactly (int32 counts), replacing the old file atomically."""
+    if name in FEATURE_ENTITIES:
+        df = df.astype({col: "int32" for col in _COUNT_COLUMNS})
+    elif name in map(_returns_name, FEATURE_ENTITIES):
+        df = df.astype({col: "int32" for col in _RETURN_COLUMNS})
+    store_dir.mkdir(parents=True, exist_ok=True)
+    file_path = _state_path(name, store_dir)
+    tmp_path = file_path.with_suffix(".tmp")
+    df.to_parquet(tmp_path, index=False)
+    tmp_path.replace(file_path)
+
+
+def _merge_buckets(
+    buckets: pd.DataFrame,
+    delta: pd.DataFrame,
+    keys: list[str],
+    columns: list[str] = _BUCKET_COLUMNS
+) -> pd.DataFrame:
+    """Adds delta aggregates into the running buckets, e.g. per (entity, date)."""
+    if delta.empty:
+        return buckets
+    merged = pd.concat([buckets, delta], ignore_index=True)
+    return merged.groupby(keys, as_index=False, sort=True)[columns].sum()
+
+
+def _return_delta(hits: pd.DataFrame, key: str, counted: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returned line counts per (entity, order date, returned_at) for hits, and
+    returned order counts for the subset of hits whose orders count.
+    """
+    keys = [key, "date", "returned_at"]
+    delta = pd.DataFrame({"returned_lines": hits.groupby(keys).size()})
+    delta["returned_orders"] = counted.groupby(keys)["Order Key"].nunique()
+    return delta.reindex(columns=_RETURN_COLUMNS).fillna(0).reset_index()
+
+
+def reset_feature_store(store_dir: Path = FEATURE_STORE_DIR) -> None:
+    """
+    Drops all feature state, e.g. before a full reload of orders. The dates
+    returns became known are kept, so a rebuild reproduces earlier
+    point-in-time reads.
+    """
+    for name in [
+        _LINE_INDEX,
+        *FEATURE_ENTITIES,
+        *map(_returns_name, FEATURE_ENTITIES),
+        *(f"{entity}_features" for entity in FEATURE_ENTITIES)
+    ]:
+        _state_path(name, store_dir).unlink(missing_ok=True)
+    logger.info(f"Feature store reset: {store_dir}")
+
+
+# -----------------------
+# Incremental updates
+# -----------------------
+def update_features_from_orders(
+    orders: pd.DataFrame,
+    replace: bool = False,
+    store_dir: Path = FEATURE_STORE_DIR
+) -> int:
+    """
+    Folds new order lines into the per-customer and per-product running aggregates.
+
+    Lines already in the order line index, keyed by (Order Key, Product ID),
+    are skipped, so re-processing a batch does not double count.
+
+    Args:
+        orders (pd.DataFrame): Validated order rows with Order Key
+        replace (bool): Rebuild the store from these rows only
+        store_dir (Path): Feature store directory
+
+    Returns:
+        int: Number of new order lines folded in
+    """
+    if replace:
+        reset_feature_store(store_dir)
+
+    lines = orders[[*_LINE_KEY, "Customer ID", "Order Date", "Quantity", "Sales", "Profit", "Discount"]].copy()
+    lines["date"] = pd.to_datetime(lines["Order Date"], errors="coerce").dt.normalize()
+
+    bad_dates = lines["date"].isna()
+    if bad_dates.any():
+        logger.warning(f"Skipping {int(bad_dates.sum())} order lines with unparseable Order Date")
+        lines = lines[~bad_dates]
+
+    index = _read_state(_LINE_INDEX, store_dir)
+
+    # -----------------------
+    # New lines only
+    # -----------------------
+    known = pd.MultiIndex.from_frame(lines[_LINE_KEY]).isin(pd.MultiIndex.from_frame(index[_LINE_KEY]))
+    if known.any():
+        logger.info(f"Skipping {int(known.sum())} order lines already in the feature store")
+        lines = lines[~known]
+
+    if lines.empty:
+        logger.info("No new order lines for the feature store")
+        return 0
+
+    # An order counts once per customer; lines of already-known orders add to its totals only
+    lines["new_order"] = ~lines["Order Key"].isin(index["Order Key"])
+    # Lines added to an order that was already returned count as returned, known since its return
+    returned_at = index[index["returned"]].drop_duplicates("Order Key").set_index("Order Key")["returned_at"]
+    lines["returned_at"] = returned_at.reindex(lines["Order Key"]).to_numpy()
+    lines["returned"] = lines["returned_at"].notna()
+    lines["discounted"] = lines["Discount"] > 0
+
+    for entity, key in FEATURE_ENTITIES.items():
+        groups = lines.groupby([key, "date"])
+        delta = groups.agg(
+            lines=("Order Key", "size"),
+            quantity=("Quantity", "sum"),
+            sales=("Sales", "sum"),
+            profit=("Profit", "sum"),
+            discount_sum=("Discount", "sum"),
+            discounted_lines=("discounted", "sum"),
+        )
+
+        if entity == "customer":
+            order_lines = lines[lines["new_order"]]
+        else:
+            order_lines = lines  # (Order Key, Product ID) pairs are all new here
+        delta["orders"] = order_lines.groupby([key, "date"])["Order Key"].nunique()
+
+        delta = delta.reindex(columns=_BUCKET_COLUMNS).fillna(0).reset_index()
+        buckets = _merge_buckets(_read_state(entity, store_dir), delta, [key, "date"])
+        _write_state(entity, buckets, store_dir)
+
+        returned_lines = lines[lines["returned"]]
+        if not returned_lines.empty:
+            # The customer's returned order was already counted when it was returned
+            counted = returned_lines if entity == "product" else returned_lines.iloc[0:0]
+            return_delta = _return_delta(returned_lines, key, counted)
+            return_buckets = _read_state(_returns_name(entity), store_dir)
+            _write_state(
+                _returns_name(entity),
+                _merge_buckets(return_buckets, return_delta, [key, "date", "returned_at"], _RETURN_COLUMNS),
+                store_dir
+            )
+
+    new_index = lines.drop_duplicates(subset=_LINE_KEY)[_LINE_COLUMNS]
+    _write_state(_LINE_INDEX, pd.concat([index, new_index], ignore_index=True), store_dir)
+
+    logger.info(
+        f"Feature store updated from orders | New lines: {len(lines)} | "
+        f"New orders: {lines.loc[lines['new_order'], 'Order Key'].nunique()}"
+    )
+    return len(lines)
+
+
+def update_features_from_returns(
+    returns: pd.DataFrame,
+    replace: bool = False,
+    returned_at: str | pd.Timestamp = None,
+    store_dir: Path = FEATURE_STORE_DIR
+) -> int:
+    """
+    Flags returned orders and adds them to the return aggregates.
+
+    returns.csv carries no return date, so each return is stamped with the
+    date it became known (returned_at, by default the ingestion date) and
+    bucketed under its order's date; point-in-time reads only count returns
+    known by then. An order keeps the date its return was first seen, also
+    across replace and store rebuilds.
+
+    Args:
+        returns (pd.DataFrame): Validated return rows with Order Key
+        replace (bool): Clear previously recorded returns first
+        returned_at (str | pd.Timestamp): Date returns not seen before became known (defaults to today)
+        store_dir (Path): Feature store directory
+
+    Returns:
+        int: Number of newly returned orders
+    """
+    returned_at = pd.Timestamp(returned_at if returned_at is not None else pd.Timestamp.now()).normalize()
+    index = _read_state(_LINE_INDEX, store_dir)
+    return_states = {entity: _read_state(_returns_name(entity), store_dir) for entity in FEATURE_ENTITIES}
+
+    if replace:
+        index["returned"] = False
+        index["returned_at"] = pd.NaT
+        return_states = {entity: _empty_returns(entity) for entity in FEATURE_ENTITIES}
+
+    returned_ids = returns.loc[returns["Returned"].str.strip().str.lower() == "yes", "Order Key"].unique()
+
+    # Returns seen before keep the date they first became known
+    seen = pd.DataFrame({"Order Key": pd.array(returned_ids, dtype="Int64"), "returned_at": returned_at})
+    return_dates = pd.concat([_read_state(_RETURN_DATES, store_dir), seen], ignore_index=True)
+    return_dates = return_dates.groupby("Order Key", as_index=False)["returned_at"].min()
+    unmatched = ~pd.Series(returned_ids).isin(index["Order Key"])
+    if unmatched.any():
+        logger.warning(f"{int(unmatched.sum())} returned orders are not in the feature store")
+
+    newly_returned = index["Order Key"].isin(returned_ids) & ~index["returned"]
+    hits = index[newly_returned].copy()
+    hits["returned_at"] = return_dates.set_index("Order Key")["returned_at"].reindex(hits["Order Key"]).to_numpy()
+    # An order with some lines already flagged was already counted as returned
+    new_orders = ~hits["Order Key"].isin(index.loc[index["returned"], "Order Key"])
+
+    for entity, key in FEATURE_ENTITIES.items():
+        counted = hits[new_orders] if entity == "customer" else hits
+        delta = _return_delta(hits, key, counted)
+        _write_state(
+            _returns_name(entity),
+            _merge_buckets(return_states[entity], delta, [key, "date", "returned_at"], _RETURN_COLUMNS),
+            store_dir
+        )
+
+    index.loc[newly_returned, "returned"] = True
+    index.loc[newly_returned, "returned_at"] = hits["returned_at"].to_numpy()
+    _write_state(_LINE_INDEX, index, store_dir)
+    _write_state(_RETURN_DATES, return_dates, store_dir)
+
+    returned_orders = hits.loc[new_orders, "Order Key"].nunique()
+    logger.info(f"Feature store updated from returns | Newly returned orders: {returned_orders}")
+    return returned_orders
+
+
+# -----------------------
+# Point-in-time reads
+# -----------------------
+def _ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    return numerator / denominator.where(denominator != 0)
+
+
+def _quintile_score(values: pd.Series, ascending: bool = True) -> pd.Series:
+    """1-5 score from the percentile rank; 5 is best."""
+    return np.ceil(values.rank(method="first", ascending=ascending, pct=True) * 5).astype("int8")
+
+
+def read_features(
+    entity: str = "customer",
+    as_of: str | pd.Timestamp = None,
+    windows_days: tuple[int, ...] = FEATURE_WINDOWS_DAYS,
+    store_dir: Path = FEATURE_STORE_DIR
+) -> pd.DataFrame:
+    """
+    Computes features for every entity as of a date, using only orders
+    placed on or before it and returns known by then (returned_at). Without
+    as_of, features are as of the latest order date with every return
+    known so far.
+
+    Features: recency/tenure, lifetime order, sales and profit totals,
+    average order value, profit margin, average discount, discounted line
+    ratio and return rate, the same over each rolling window, and (for
+    customers) RFM quintile scores.
+
+    Args:
+        entity (str): "customer" or "product"
+        as_of (str | pd.Timestamp): Point in time (defaults to the latest order date, current returns)
+        windows_days (tuple[int, ...]): Rolling window lengths in days
+        store_dir (Path): Feature store directory
+
+    Returns:
+        pd.DataFrame: One row per entity
+    """
+    if entity not in FEATURE_ENTITIES:
+        logger.error(f"Invalid feature entity: {entity}")
+        raise ValueError(f"entity must be one of {set(FEATURE_ENTITIES)}")
+
+    key = FEATURE_ENTITIES[entity]
+    buckets = _read_state(entity, store_dir)
+    if buckets.empty:
+        logger.warning(f"Feature store has no {entity} data")
+        return pd.DataFrame()
+
+    returns = _read_state(_returns_name(entity), store_dir)
+    if as_of is None:
+        as_of = buckets["date"].max()
+    else:
+        as_of = pd.Timestamp(as_of).normalize()
+        returns = returns[returns["returned_at"] <= as_of]
+    history = buckets[buckets["date"] <= as_of]
+    returns = returns[returns["date"] <= as_of]
+
+    groups = history.groupby(key)
+    features = groups[_BUCKET_COLUMNS].sum()
+    features["first_order_date"] = groups["date"].min()
+    features["last_order_date"] = groups["date"].max()
+    features["recency_days"] = (as_of - features["last_order_date"]).dt.days
+    features["tenure_days"] = (as_of - features["first_order_date"]).dt.days
+    features[_RETURN_COLUMNS] = returns.groupby(key)[_RETURN_COLUMNS].sum().reindex(features.index, fill_value=0)
+
+    returned = "returned_orders" if entity == "customer" else "returned_lines"
+    denominator = "orders" if entity == "customer" else "lines"
+
+    features["avg_order_value"] = _ratio(features["sales"], features["orders"])
+    features["profit_margin"] = _ratio(features["profit"], features["sales"])
+    features["avg_discount"] = _ratio(features["discount_sum"], features["lines"])
+    features["discounted_line_ratio"] = _ratio(features["discounted_lines"], features["lines"])
+    features["return_rate"] = _ratio(features[returned], features[denominator])
+
+    for days in windows_days:
+        window = history[history["date"] > as_of - pd.Timedelta(days=days)]
+        sums = window.groupby(key)[_BUCKET_COLUMNS].sum().reindex(features.index, fill_value=0)
+        window_returns = returns[returns["date"] > as_of - pd.Timedelta(days=days)]
+        sums[_RETURN_COLUMNS] = window_returns.groupby(key)[_RETURN_COLUMNS].sum().reindex(features.index, fill_value=0)
+        features[f"orders_{days}d"] = sums["orders"]
+        features[f"sales_{days}d"] = sums["sales"]
+        features[f"profit_margin_{days}d"] = _ratio(sums["profit"], sums["sales"])
+        features[f"avg_discount_{days}d"] = _ratio(sums["discount_sum"], sums["lines"])
+        features[f"return_rate_{days}d"] = _ratio(sums[returned], sums[denominator])
+
+    if entity == "customer":
+        features["r_score"] = _quintile_score(features["recency_days"], ascending=False)
+        features["f_score"] = _quintile_score(features["orders"])
+        features["m_score"] = _quintile_score(features["sales"])
+
+    features.insert(0, "as_of", as_of)
+    return features.reset_index()
+
+
+def materialize_features(
+    as_of: str | pd.Timestamp = None,
+    store_dir: Path = FEATURE_STORE_DIR
+) -> dict[str, Path]:
+    """
+    Writes a feature snapshot per entity (<entity>_features.parquet) for
+    the ML layer. Earlier points in time are served by read_features.
+
+    Returns:
+        dict[str, Path]: Snapshot file per entity
+    """
+    snapshots = {}
+    for entity in FEATURE_ENTITIES:
+        features = read_features(entity, as_of, store_dir=store_dir)
+        if features.empty:
+            continue
+        file_path = _state_path(f"{entity}_features", store_dir)
+        _write_state(f"{entity}_features", features, store_dir)
+        snapshots[entity] = file_path
+        logger.info(
+            f"Materialized {entity} features | Rows: {len(features)} | "
+            f"Columns: {features.shape[1]} | As of: {features['as_of'].iloc[0].date()}"
+        )
+    return snapshots
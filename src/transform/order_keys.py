@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# <market>-<year>-<customer letters><customer digits>-<order date serial>, e.g. IN-2017-CA120551-42816
+ORDER_ID_PATTERN = r"^(?P<market>[A-Z]{2})-(?P<year>\d{4})-(?P<letters>[A-Za-z]{2})(?P<digits>\d{1,8})-(?P<serial>\d{5})$"
+
+# The trailing number is the order date as a spreadsheet date serial; the
+# year in the ID is always that date's year, so it is derived on decode
+_SERIAL_EPOCH = np.datetime64("1899-12-30", "D")
+
+# Mixed-radix fields, most significant first. The largest key is
+# 676 * 2704 * 111_111_110 * 45_000 - 1 < 2**63, so keys fit a signed BIGINT.
+_MARKET_ALPHABET = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)
+_LETTER_ALPHABET = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz", dtype=np.uint8)
+_LETTER_SPACE = len(_LETTER_ALPHABET) ** 2
+# Digit strings of length L are offset by the count of all shorter strings, so leading zeros survive
+_MAX_DIGITS = 8
+_DIGIT_OFFSETS = np.array([(10 ** length - 10) // 9 for length in range(1, _MAX_DIGITS + 2)], dtype=np.int64)
+_DIGIT_SPACE = int(_DIGIT_OFFSETS[-1])
+_SERIAL_BASE = 40_000  # 2009-07-06
+_SERIAL_SPACE = 45_000
+
+ORDER_KEY_COLUMN = "Order Key"
+
+
+def _pair_index(pairs: pa.Array, alphabet: np.ndarray) -> np.ndarray:
+    """Maps two-character ASCII strings to base-len(alphabet) integers (-1 based for nulls)."""
+    fixed = pairs.cast(pa.binary(2))
+    codes = np.frombuffer(fixed.buffers()[1], dtype=np.uint8)
+    codes = codes[fixed.offset * 2:(fixed.offset + len(fixed)) * 2].reshape(-1, 2)
+    lookup = np.full(256, -1, dtype=np.int64)
+    lookup[alphabet] = np.arange(len(alphabet))
+    index = lookup[codes]
+    return index[:, 0] * len(alphabet) + index[:, 1]
+
+
+def _pair_bytes(index: np.ndarray, alphabet: np.ndarray) -> np.ndarray:
+    return np.stack([alphabet[index // len(alphabet)], alphabet[index % len(alphabet)]], axis=1)
+
+
+def _digit_bytes(values: np.ndarray, width: int) -> np.ndarray:
+    """Zero-padded ASCII digits of values, one row per value."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (values[:, None] // powers % 10 + ord("0")).astype(np.uint8)
+
+
+def _serial_years(serials: np.ndarray) -> np.ndarray:
+    dates = _SERIAL_EPOCH + serials.astype("timedelta64[D]")
+    return dates.astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+def parse_order_ids(order_ids: pd.Series) -> pd.DataFrame:
+    """
+    Parses Order IDs into their components and packs each into a 64-bit key.
+
+    Rows that cannot be encoded get a null key and an error reason.
+
+    Returns:
+        pd.DataFrame: market, year, customer_code, serial, order_key (Int64)
+        and error, aligned with order_ids
+    """
+    ids = pa.Array.from_pandas(order_ids.astype(object), type=pa.string())
+    parts = pc.extract_regex(ids, ORDER_ID_PATTERN)
+    matched = parts.is_valid().to_numpy(zero_copy_only=False)
+
+    # Components of the rows matching the pattern
+    parts = parts.filter(parts.is_valid())
+    market = parts.field("market")
+    letters = parts.field("letters")
+    digits = parts.field("digits")
+    years = pc.cast(parts.field("year"), pa.int64()).to_numpy()
+    serials = pc.cast(parts.field("serial"), pa.int64()).to_numpy()
+    digit_lengths = pc.utf8_length(digits).to_numpy().astype(np.int64)
+
+    key = _pair_index(market, _MARKET_ALPHABET)
+    key = key * _LETTER_SPACE + _pair_index(letters, _LETTER_ALPHABET)
+    key = key * _DIGIT_SPACE + _DIGIT_OFFSETS[digit_lengths - 1] + pc.cast(digits, pa.int64()).to_numpy()
+    key = key * _SERIAL_SPACE + (serials - _SERIAL_BASE)
+
+    out_of_range = (serials < _SERIAL_BASE) | (serials >= _SERIAL_BASE + _SERIAL_SPACE)
+    year_mismatch = ~out_of_range & (_serial_years(serials) != years)
+
+    error = np.where(out_of_range, "date serial out of range", None)
+    error = np.where(year_mismatch, "year does not match date serial", error)
+
+    # Scatter back onto all rows
+    parsed = pd.DataFrame(index=order_ids.index)
+    parsed["market"] = pd.Series(pd.NA, index=order_ids.index, dtype="string")
+    parsed["year"] = pd.Series(pd.NA, index=order_ids.index, dtype="Int64")
+    parsed["customer_code"] = pd.Series(pd.NA, index=order_ids.index, dtype="string")
+    parsed["serial"] = pd.Series(pd.NA, index=order_ids.index, dtype="Int64")
+    parsed["order_key"] = pd.Series(pd.NA, index=order_ids.index, dtype="Int64")
+    parsed["error"] = pd.Series("does not match pattern", index=order_ids.index, dtype="string")
+
+    parsed.loc[matched, "market"] = market.to_numpy(zero_copy_only=False)
+    parsed.loc[matched, "year"] = years
+    parsed.loc[matched, "customer_code"] = pc.binary_join_element_wise(letters, digits, "").to_numpy(zero_copy_only=False)
+    parsed.loc[matched, "serial"] = serials
+    parsed.loc[matched, "order_key"] = pd.array(key, dtype="Int64")
+    parsed.loc[matched, "error"] = pd.array(error, dtype="string")
+
+    invalid = parsed["error"].notna()
+    parsed.loc[invalid, "order_key"] = pd.NA
+    parsed.loc[order_ids.isna(), "error"] = "missing"
+    return parsed
+
+
+def encode_order_ids(order_ids: pd.Series) -> pd.Series:
+    """Packs Order IDs into 64-bit keys; malformed IDs map to <NA>."""
+    return parse_order_ids(order_ids)["order_key"]
+
+
+def fallback_order_keys(order_ids: pd.Series) -> pd.Series:
+    """
+    Negative keys for IDs the codec cannot encode, from a 63-bit hash of
+    the ID, so they stay distinct from (non-negative) encoded keys and
+    join consistently across tables. Null IDs map to <NA>.
+    """
+    hashes = pd.util.hash_pandas_object(order_ids.astype(str), index=False).to_numpy(dtype=np.uint64)
+    keys = -(hashes >> np.uint64(1)).astype(np.int64) - 1
+    return pd.Series(keys, index=order_ids.index, dtype="Int64").mask(order_ids.isna())
+
+
+def decode_order_keys(order_keys: pd.Series) -> pd.Series:
+    """Reverses encode_order_ids exactly; null and fallback (negative) keys map to <NA>."""
+    decoded = pd.Series(pd.NA, index=order_keys.index, dtype="string")
+    present = (order_keys.notna() & (order_keys >= 0)).to_numpy(dtype=bool)
+    if not present.any():
+        return decoded
+
+    rest = order_keys[present].to_numpy(dtype=np.int64)
+    rest, serials = np.divmod(rest, _SERIAL_SPACE)
+    serials += _SERIAL_BASE
+    rest, digit_codes = np.divmod(rest, _DIGIT_SPACE)
+    markets, letters = np.divmod(rest, _LETTER_SPACE)
+    lengths = np.searchsorted(_DIGIT_OFFSETS, digit_codes, side="right")
+
+    # Build all IDs as one ASCII byte matrix, digits right-aligned in a
+    # fixed-width field, then drop each row's padding into a string array
+    dash = np.full((len(rest), 1), ord("-"), dtype=np.uint8)
+    matrix = np.hstack([
+        _pair_bytes(markets, _MARKET_ALPHABET), dash,
+        _digit_bytes(_serial_years(serials), 4), dash,
+        _pair_bytes(letters, _LETTER_ALPHABET),
+        _digit_bytes(digit_codes - _DIGIT_OFFSETS[lengths - 1], _MAX_DIGITS), dash,
+        _digit_bytes(serials, 5)
+    ])
+    keep = np.ones(matrix.shape, dtype=bool)
+    keep[:, 10:10 + _MAX_DIGITS] = np.arange(_MAX_DIGITS) >= (_MAX_DIGITS - lengths)[:, None]
+
+    offsets = np.concatenate([[0], np.cumsum(keep.sum(axis=1))]).astype(np.int32)
+    ids = pa.StringArray.from_buffers(len(rest), pa.py_buffer(offsets), pa.py_buffer(matrix[keep]))
+    decoded[present] = ids.to_numpy(zero_copy_only=False)
+    return decoded
+
+
+def add_order_keys(
+    df: pd.DataFrame,
+    column: str = "Order ID",
+    key_column: str = ORDER_KEY_COLUMN,
+    max_malformed_ratio: float = 1.0,
+    sample_size: int = 10
+) -> dict:
+    """
+    Adds a BIGINT-compatible key column parsed from Order IDs.
+
+    IDs that cannot be encoded get a negative fallback key (see
+    fallback_order_keys), so the key column is never null for a present
+    ID, and are reported in bulk. Raises error if the malformed ratio
+    exceeds max_malformed_ratio (by default, only reports).
+
+    Returns:
+        dict: Malformed ID report with counts per reason and a sample
+    """
+    logger.info(f"Encoding {column} into {key_column}")
+
+    parsed = parse_order_ids(df[column])
+    errors = parsed["error"].dropna()
+
+    keys = parsed["order_key"]
+    if len(errors):
+        keys = keys.fillna(fallback_order_keys(df.loc[errors.index, column]))
+    df[key_column] = keys
+    malformed_ratio = len(errors) / len(df) if len(df) else 0.0
+    report = {
+        "column": column,
+        "rows": len(df),
+        "malformed_count": len(errors),
+        "malformed_ratio": malformed_ratio,
+        "reasons": errors.value_counts().to_dict(),
+        "sample": df.loc[errors.index, column].drop_duplicates().head(sample_size).tolist()
+    }
+
+    if len(errors):
+        logger.warning(
+            f"Column {column} has {len(errors)} malformed IDs ({malformed_ratio:.2%}) | "
+            f"Reasons: {report['reasons']} | Sample: {report['sample']}"
+        )
+
+    if malformed_ratio > max_malformed_ratio:
+        logger.error(f"Column {column} malformed ratio {malformed_ratio:.2%} exceeds {max_malformed_ratio:.2%}")
+        raise ValueError(f"Column {column} has {len(errors)} malformed IDs")
+
+    logger.info(
+        f"Order key encoding completed | Keys: {len(df) - len(errors)} | "
+        f"Fallback keys: {int(df.loc[errors.index, key_column].notna().sum())}"
+    )
+    return report
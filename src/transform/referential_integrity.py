@@ -0,0 +1,191 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Parent key indexes built during the current run, keyed by name (e.g. "orders.Order ID")
+_KEY_INDEXES: dict = {}
+
+
+def _hash_keys(keys: pd.Series) -> np.ndarray:
+    """
+    Hash keys to uint64. Keys are compared as strings so parent and child
+    columns with different dtypes still match.
+    """
+    return pd.util.hash_pandas_object(
+        keys.astype(str),
+        index=False
+    ).to_numpy(dtype=np.uint64)
+
+
+class KeyIndex:
+    """
+    Membership index over a parent key set.
+
+    - "exact": sorted array of unique 64-bit key hashes, probed with searchsorted
+    - "bloom": Bloom filter sized from expected_items and fp_rate; never reports
+      a present key as missing, may miss a small fraction of orphans
+    """
+
+    def __init__(self, mode: str = "exact", expected_items: int = None, fp_rate: float = 0.001):
+        valid_modes = {"exact", "bloom"}
+        if mode not in valid_modes:
+            logger.error(f"Invalid key index mode: {mode}")
+            raise ValueError(f"mode must be one of {valid_modes}")
+
+        self.mode = mode
+        self.size = 0
+        self.expected_items = expected_items
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+        if mode == "bloom":
+            if not expected_items:
+                raise ValueError("expected_items is required for bloom mode")
+            self.num_bits = max(8, int(math.ceil(-expected_items * math.log(fp_rate) / (math.log(2) ** 2))))
+            self.num_hashes = max(1, int(round(self.num_bits / expected_items * math.log(2))))
+            self._bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _bit_positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Kirsch-Mitzenmacher double hashing: position_i = h1 + i * h2 (mod m)."""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def add(self, keys: pd.Series) -> None:
+        hashes = _hash_keys(keys.dropna())
+
+        if self.mode == "exact":
+            self._hashes = np.union1d(self._hashes, hashes)
+            self.size = int(self._hashes.size)
+            return
+
+        positions = self._bit_positions(hashes).ravel()
+        np.bitwise_or.at(
+            self._bits,
+            (positions >> np.uint64(3)).astype(np.int64),
+            (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        )
+        within_capacity = self.size <= self.expected_items
+        self.size += int(hashes.size)
+        if within_capacity and self.size > self.expected_items:
+            logger.warning(
+                f"Bloom filter holds {self.size} keys, above the {self.expected_items} it was sized for; "
+                f"false-positive rate will exceed target. Rebuild with a larger expected_items"
+            )
+
+    def contains(self, keys: pd.Series) -> np.ndarray:
+        """
+        Vectorized membership test.
+
+        Returns:
+            np.ndarray: Boolean mask aligned with keys (nulls are never members)
+        """
+        result = np.zeros(len(keys), dtype=bool)
+        not_null = keys.notna().to_numpy()
+        hashes = _hash_keys(keys[not_null])
+
+        if self.mode == "exact":
+            if self._hashes.size:
+                positions = np.searchsorted(self._hashes, hashes)
+                positions = np.minimum(positions, self._hashes.size - 1)
+                result[not_null] = self._hashes[positions] == hashes
+            return result
+
+        positions = self._bit_positions(hashes)
+        bits = self._bits[(positions >> np.uint64(3)).astype(np.int64)]
+        is_set = (bits >> (positions & np.uint64(7)).astype(np.uint8)) & np.uint8(1)
+        result[not_null] = is_set.all(axis=1)
+        return result
+
+
+def register_parent_keys(
+    name: str,
+    keys: pd.Series,
+    mode: str = "exact",
+    expected_items: int = None,
+    fp_rate: float = 0.001
+) -> KeyIndex:
+    """
+    Builds (or extends) the key index for a parent table once per run.
+
+    Args:
+        name (str): Index name, e.g. "orders.Order ID"
+        keys (pd.Series): Parent key values (may be one chunk of many)
+        mode (str): "exact" or "bloom"
+        expected_items (int): Expected total key count across all chunks;
+            required for bloom mode, which cannot be resized once built
+        fp_rate (float): Target Bloom filter false-positive rate
+
+    Returns:
+        KeyIndex: The registered index
+    """
+    index = _KEY_INDEXES.get(name)
+    if index is None:
+        index = KeyIndex(mode=mode, expected_items=expected_items, fp_rate=fp_rate)
+        _KEY_INDEXES[name] = index
+
+    index.add(keys)
+    logger.info(f"Registered parent keys for {name} | Mode: {index.mode} | Keys: {index.size}")
+    return index
+
+
+def clear_parent_keys() -> None:
+    """Drops all registered parent key indexes."""
+    _KEY_INDEXES.clear()
+
+
+def validate_foreign_keys(
+    df: pd.DataFrame,
+    column: str,
+    parent_name: str,
+    max_orphan_ratio: float = 0.0,
+    sample_size: int = 10
+) -> dict:
+    """
+    Checks that every child key exists in a registered parent key index.
+    Raises error if the orphan ratio exceeds max_orphan_ratio.
+
+    Returns:
+        dict: Orphan report with counts and a sample of orphan keys
+    """
+    logger.info(f"Validating foreign key {column} -> {parent_name}")
+
+    index = _KEY_INDEXES.get(parent_name)
+    if index is None:
+        logger.warning(f"No key index registered for {parent_name}, skipping foreign key check")
+        return {"parent": parent_name, "column": column, "checked": False}
+
+    keys = df[column]
+    orphan_mask = ~index.contains(keys) & keys.notna().to_numpy()
+    orphans = keys[orphan_mask]
+    orphan_count = int(orphan_mask.sum())
+    orphan_ratio = orphan_count / len(keys) if len(keys) else 0.0
+
+    report = {
+        "parent": parent_name,
+        "column": column,
+        "checked": True,
+        "mode": index.mode,
+        "rows": len(keys),
+        "orphan_count": orphan_count,
+        "distinct_orphans": int(orphans.nunique()),
+        "orphan_ratio": orphan_ratio,
+        "sample": orphans.drop_duplicates().head(sample_size).tolist()
+    }
+
+    if orphan_ratio > max_orphan_ratio:
+        logger.error(
+            f"Column {column} has {orphan_count} orphan keys not in {parent_name} "
+            f"({orphan_ratio:.2%}) | Sample: {report['sample']}"
+        )
+        raise ValueError(
+            f"Column {column} has {orphan_count} orphan keys not in {parent_name}"
+        )
+
+    logger.info(f"Foreign key validation passed | Orphans: {orphan_count}")
+    return report
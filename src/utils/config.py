@@ -17,6 +17,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+PROFILES_DIR = PROCESSED_DATA_DIR / "profiles"
+WAREHOUSE_CACHE_DIR = PROCESSED_DATA_DIR / "warehouse_cache"
+RAW_LEDGER_PATH = PROCESSED_DATA_DIR / "raw_ledger.json"
+FEATURE_STORE_DIR = PROCESSED_DATA_DIR / "features"
 
 # -----------------------------
 # PostgreSQL Configuration
@@ -32,9 +36,26 @@ POSTGRES_URI = (
     f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
+# Parallel loading: connections used for large tables (1 = single-connection load)
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "1"))
+
+# Out-of-core deduplication memory budget (MB); larger raw files are deduplicated on disk
+DEDUP_MEMORY_BUDGET_MB = int(os.getenv("DEDUP_MEMORY_BUDGET_MB", "512"))
+
+# Watch mode: failed attempts before a raw drop is quarantined
+RAW_MAX_ATTEMPTS = int(os.getenv("RAW_MAX_ATTEMPTS", "3"))
+
+# CSV extraction: "arrow" (multithreaded) or "pandas" (single-threaded C parser)
+CSV_READER_ENGINE = os.getenv("CSV_READER_ENGINE", "arrow")
+CSV_BLOCK_SIZE_MB = int(os.getenv("CSV_BLOCK_SIZE_MB", "4"))
+
 # API keys
 EXCHANGE_RATE_API_KEY = os.getenv("EXCHANGE_RATE_API_KEY")
 
 # API URLs
 EXCHANGE_RATE_API_URL = "https://v6.exchangerate-api.com/v6/{api_key}/latest/{base}"
-FAKE_STORE_API_URL = "https://fakestoreapi.com/products"
\ No newline at end of file
+FAKE_STORE_API_URL = "https://fakestoreapi.com/products"
+
+# API pagination (None = single response; "page", "offset" or "cursor")
+FAKE_STORE_PAGINATION = os.getenv("FAKE_STORE_PAGINATION") or None
+FAKE_STORE_PAGE_SIZE = int(os.getenv("FAKE_STORE_PAGE_SIZE", "100"))
\ No newline at end of file